@@ -6,6 +6,11 @@ Logs all email processing: incoming emails, AI responses, routing decisions, and
 
 import os
 import json
+import atexit
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, asdict
@@ -14,6 +19,9 @@ from typing import Optional
 # Default log directory
 LOG_DIR = Path(__file__).parent / "logs"
 
+# Tells the background writer to finish
+_STOP = object()
+
 
 @dataclass
 class EmailLogEntry:
@@ -43,9 +51,17 @@ class EmailLogEntry:
 
 
 class EmailLogger:
-    """Logger for email processing events."""
+    """Logger for email processing events.
+    
+    With background=True, entries are queued and written by a single
+    thread through 64KB buffers flushed about once a second, so callers
+    never wait on disk. close() writes out whatever is still queued.
+    """
     
-    def __init__(self, log_dir: str = None, session_id: str = None):
+    FLUSH_INTERVAL = 1.0  # seconds
+    BUFFER_SIZE = 64 * 1024
+    
+    def __init__(self, log_dir: str = None, session_id: str = None, background: bool = False):
         self.log_dir = Path(log_dir) if log_dir else LOG_DIR
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
@@ -57,6 +73,80 @@ class EmailLogger:
         
         self.log_file = self.log_dir / f"email_log_{self.session_id}.jsonl"
         self.actions_file = self.log_dir / f"actions_{self.session_id}.jsonl"
+        
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._writer: Optional[threading.Thread] = None
+        if background:
+            self._queue = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer.start()
+    
+    def close(self) -> None:
+        """Write out queued entries and stop the background writer.
+        
+        Blocks until the writer has drained the queue and closed its files.
+        """
+        if self._writer:
+            q = self._queue
+            q.put(_STOP)
+            self._writer.join()
+            self._writer = None
+            self._queue = None
+            # Entries queued after _STOP, by threads racing close()
+            while True:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    self._append(*item)
+    
+    def _append(self, path: Path, record: dict) -> None:
+        """Append one JSON line, directly or via the background writer."""
+        if self._queue is not None:
+            self._queue.put((path, record))
+        else:
+            with open(path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+    
+    def _writer_loop(self) -> None:
+        """Drain the queue into the log files, flushing every FLUSH_INTERVAL.
+        
+        A record that cannot be written is reported and dropped, so one bad
+        entry or a full disk does not stop the writer.
+        """
+        files = {}
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.FLUSH_INTERVAL)
+                except queue.Empty:
+                    item = None
+                if item is _STOP:
+                    break
+                if item is not None:
+                    path, record = item
+                    try:
+                        f = files.get(path)
+                        if f is None:
+                            f = files[path] = open(path, "a", buffering=self.BUFFER_SIZE)
+                        f.write(json.dumps(record) + "\n")
+                    except (OSError, TypeError, ValueError) as e:
+                        print(f"email_logger: could not write to {path}: {e}", file=sys.stderr)
+                if item is None or time.monotonic() - last_flush >= self.FLUSH_INTERVAL:
+                    for path, f in files.items():
+                        try:
+                            f.flush()
+                        except OSError as e:
+                            print(f"email_logger: could not flush {path}: {e}", file=sys.stderr)
+                    last_flush = time.monotonic()
+        finally:
+            for path, f in files.items():
+                try:
+                    f.close()
+                except OSError as e:
+                    print(f"email_logger: could not close {path}: {e}", file=sys.stderr)
     
     def log_email(
         self,
@@ -97,8 +187,7 @@ class EmailLogger:
         )
         
         # Append to JSONL file
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(asdict(entry)) + "\n")
+        self._append(self.log_file, asdict(entry))
         
         return entry
     
@@ -113,8 +202,7 @@ class EmailLogger:
         }
         
         # Append to session-based actions log
-        with open(self.actions_file, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+        self._append(self.actions_file, entry)
     
     def list_sessions(self) -> list:
         """List all available log sessions."""
@@ -211,6 +299,17 @@ def get_logger() -> EmailLogger:
     return _logger
 
 
+def start_background_logging() -> None:
+    """Make the global logger write from a background thread.
+    
+    Call before anything is logged. Queued entries are written out at exit.
+    """
+    global _logger
+    if _logger is None:
+        _logger = EmailLogger(background=True)
+        atexit.register(_logger.close)
+
+
 # Convenience functions
 def log_email(**kwargs):
     """Log an email processing event."""
@@ -1,17 +1,34 @@
 """Gemini-powered email analyzer using the new google-genai SDK."""
 
+import time
+from typing import Optional
+
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from .models import AnalysisResult
 
 
 class GeminiAnalyzer:
-    """Gemini AI email content analyzer."""
+    """Gemini AI email content analyzer.
+    
+    The instructions (destinations and response format) are the same for
+    every email, so they go into a Gemini context cache and each request
+    only sends the email itself.
+    """
+    
+    MODEL = "gemini-2.0-flash-exp"
+    CACHE_TTL = 3600  # seconds
+    MIN_CACHE_TOKENS = 4096  # the API refuses to cache smaller contents
     
     def __init__(self, api_key: str, destinations: list[dict]):
         self.destinations = destinations
         self.client = genai.Client(api_key=api_key)
+        self._instructions = self._build_instructions()
+        self._cache_name: Optional[str] = None
+        self._cache_expires = 0.0
+        self._caching = True  # turned off once the instructions prove uncacheable
+        self._cache_size_checked = False
     
     def analyze(self, email_data: dict) -> AnalysisResult:
         """Analyze email and determine routing destination."""
@@ -23,18 +40,41 @@ class GeminiAnalyzer:
                 reasoning="No destinations configured for AI routing",
             )
         
+        prompt = f"""EMAIL DETAILS:
+From: {email_data.get('from', 'Unknown')}
+Subject: {email_data.get('subject', 'No subject')}
+Body:
+{email_data.get('body', '')[:2000]}
+"""
+        
+        try:
+            try:
+                response = self._generate(prompt, self._cached_config())
+            except errors.ClientError as e:
+                if not self._cache_name or not self._is_cache_missing(e):
+                    raise
+                # Cache was evicted or expired server-side; retry without
+                # it and recreate it on the next request
+                self._cache_name = None
+                self._cache_expires = 0.0
+                response = self._generate(prompt, self._uncached_config())
+            return self._parse_response(response.text)
+        except Exception as e:
+            return AnalysisResult(
+                forward_to="",
+                category="error",
+                confidence=0.0,
+                reasoning=f"AI analysis failed: {str(e)}",
+            )
+    
+    def _build_instructions(self) -> str:
+        """System instructions shared by every request."""
         destinations_text = "\n".join(
             f"- {d['email']}: {d['description']}"
             for d in self.destinations
         )
         
-        prompt = f"""Analyze this email and determine which destination address it should be forwarded to.
-
-EMAIL DETAILS:
-From: {email_data.get('from', 'Unknown')}
-Subject: {email_data.get('subject', 'No subject')}
-Body:
-{email_data.get('body', '')[:2000]}
+        return f"""Analyze the email you are given and determine which destination address it should be forwarded to.
 
 AVAILABLE DESTINATIONS:
 {destinations_text}
@@ -45,20 +85,71 @@ CATEGORY: <one word category like: personal, work, newsletter, spam, urgent, soc
 CONFIDENCE: <number between 0.0 and 1.0>
 REASONING: <brief one-line explanation>
 """
+    
+    def _generate(self, prompt: str, config: types.GenerateContentConfig):
+        return self.client.models.generate_content(
+            model=self.MODEL,
+            contents=prompt,
+            config=config,
+        )
+    
+    @staticmethod
+    def _is_cache_missing(error: errors.ClientError) -> bool:
+        """True if the request failed because its cached content is gone."""
+        return error.code in (400, 403, 404) and "cache" in str(error).lower()
+    
+    def _cached_config(self) -> types.GenerateContentConfig:
+        """Request config using the cached instructions, (re)creating the
+        cache when it is about to expire.
         
+        If the cache can't be created the instructions are sent inline.
+        Creation is retried after CACHE_TTL, unless the instructions are
+        too small to cache or the API rejected them: then caching stays off.
+        """
+        if self._caching and time.monotonic() > self._cache_expires - 60:
+            self._cache_expires = time.monotonic() + self.CACHE_TTL
+            self._delete_cache()
+            self._cache_name = self._create_cache()
+        
+        if self._cache_name:
+            return types.GenerateContentConfig(cached_content=self._cache_name)
+        return self._uncached_config()
+    
+    def _create_cache(self) -> Optional[str]:
+        """Create the instructions cache and return its name, or None."""
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash-exp",
-                contents=prompt,
-            )
-            return self._parse_response(response.text)
-        except Exception as e:
-            return AnalysisResult(
-                forward_to="",
-                category="error",
-                confidence=0.0,
-                reasoning=f"AI analysis failed: {str(e)}",
+            if not self._cache_size_checked:
+                count = self.client.models.count_tokens(model=self.MODEL, contents=self._instructions)
+                self._cache_size_checked = True
+                if (count.total_tokens or 0) < self.MIN_CACHE_TOKENS:
+                    self._caching = False
+                    return None
+            cache = self.client.caches.create(
+                model=self.MODEL,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=self._instructions,
+                    ttl=f"{self.CACHE_TTL}s",
+                ),
             )
+            return cache.name
+        except errors.ClientError as e:
+            if e.code != 429:
+                self._caching = False
+            return None
+        except Exception:
+            return None
+    
+    def _delete_cache(self) -> None:
+        """Delete the current server-side cache, if any."""
+        if self._cache_name:
+            try:
+                self.client.caches.delete(name=self._cache_name)
+            except Exception:
+                pass  # it expires server-side on its own
+            self._cache_name = None
+    
+    def _uncached_config(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(system_instruction=self._instructions)
     
     def _parse_response(self, response: str) -> AnalysisResult:
         """Parse the AI response into structured result."""
@@ -389,7 +389,7 @@ class OllamaAnalyzer:
                 x = float(val.strip())
                 if x > 1.0:
                     x = x / 100.0
-                return max(0.0, min(1.0, x))
+                return 0.0 if x < 0.0 else (1.0 if x > 1.0 else x)
         except Exception:
             pass
         return 0.0
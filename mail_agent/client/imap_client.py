@@ -1,8 +1,10 @@
 """IMAP client for fetching emails."""
 
 import email
+from contextlib import contextmanager
 from email.header import decode_header
-from typing import Optional, Iterator
+from itertools import islice
+from typing import Callable, Optional, Iterator
 
 from imapclient import IMAPClient as IMAPLib
 
@@ -12,6 +14,10 @@ from .models import Email
 class IMAPClient:
     """IMAP email fetcher."""
     
+    # UIDs per FETCH command; larger batches stop paying off and make
+    # single responses huge
+    FETCH_BATCH_SIZE = 100
+    
     def __init__(self, host: str, port: int, address: str, password: str, 
                  use_ssl: bool = True, use_starttls: bool = False):
         self.host = host
@@ -51,8 +57,44 @@ class IMAPClient:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.disconnect()
     
-    def fetch_unread(self) -> Iterator[Email]:
-        """Fetch all unread emails."""
+    def noop(self) -> bool:
+        """Check the connection is still alive (also resets the idle timer)."""
+        if not self._client:
+            return False
+        try:
+            self._client.noop()
+            return True
+        except Exception:
+            return False
+    
+    def supports_idle(self) -> bool:
+        """Whether the server advertises IMAP IDLE."""
+        if not self._client:
+            raise RuntimeError("Not connected to IMAP server")
+        return b"IDLE" in self._client.capabilities()
+    
+    @contextmanager
+    def idle(self) -> Iterator[Callable[[float], bool]]:
+        """Hold the selected folder in IDLE for the duration of the block.
+        
+        Yields check(timeout), which waits up to timeout seconds and returns
+        True if the server announced new mail (EXISTS/RECENT).
+        """
+        if not self._client:
+            raise RuntimeError("Not connected to IMAP server")
+        
+        def check(timeout: float) -> bool:
+            responses = self._client.idle_check(timeout=timeout)
+            return any(len(r) > 1 and r[1] in (b"EXISTS", b"RECENT") for r in responses)
+        
+        self._client.idle()
+        try:
+            yield check
+        finally:
+            self._client.idle_done()
+    
+    def fetch_unread(self, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Email]:
+        """Fetch all unread emails, batch_size messages per FETCH."""
         if not self._client:
             raise RuntimeError("Not connected to IMAP server")
         
@@ -61,21 +103,9 @@ class IMAPClient:
         if not uids:
             return
         
-        for uid, data in self._client.fetch(uids, ["RFC822"]).items():
-            raw = data[b"RFC822"]
-            msg = email.message_from_bytes(raw)
-            
-            yield Email(
-                uid=uid,
-                from_addr=self._decode_header(msg.get("From", "")),
-                to_addr=self._decode_header(msg.get("To", "")),
-                subject=self._decode_header(msg.get("Subject", "")),
-                body=self._get_body(msg),
-                date=msg.get("Date", ""),
-                raw=raw,
-            )
-    
-    def fetch_from_folder(self, folder: str) -> list[Email]:
+        yield from self._fetch_emails(uids, batch_size)
+    
+    def fetch_from_folder(self, folder: str, batch_size: int = FETCH_BATCH_SIZE) -> list[Email]:
         """Fetch all emails from a specific folder."""
         if not self._client:
             raise RuntimeError("Not connected to IMAP server")
@@ -84,7 +114,6 @@ class IMAPClient:
         if not self._client.folder_exists(folder):
             return []
         
-        results = []
         try:
             self._client.select_folder(folder)
             uids = self._client.search(["ALL"])
@@ -92,24 +121,10 @@ class IMAPClient:
             if not uids:
                 return []
             
-            for uid, data in self._client.fetch(uids, ["RFC822"]).items():
-                raw = data[b"RFC822"]
-                msg = email.message_from_bytes(raw)
-                
-                results.append(Email(
-                    uid=uid,
-                    from_addr=self._decode_header(msg.get("From", "")),
-                    to_addr=self._decode_header(msg.get("To", "")),
-                    subject=self._decode_header(msg.get("Subject", "")),
-                    body=self._get_body(msg),
-                    date=msg.get("Date", ""),
-                    raw=raw,
-                ))
+            return list(self._fetch_emails(uids, batch_size))
         finally:
             # Always switch back to INBOX
             self._client.select_folder("INBOX")
-        
-        return results
     
     def mark_as_read(self, uid: int) -> None:
         """Mark email as read."""
@@ -125,20 +140,48 @@ class IMAPClient:
 
     def move_email(self, uid: int, folder: str, source_folder: str = "INBOX") -> None:
         """Move email to a specific folder from source folder."""
+        self.move_emails([uid], folder, source_folder)
+    
+    def move_emails(self, uids: list[int], folder: str, source_folder: str = "INBOX") -> None:
+        """Move several emails to a folder with a single MOVE command."""
         if not self._client:
             raise RuntimeError("Not connected to IMAP server")
         
-        # Select source folder to find the email
-        self._client.select_folder(source_folder)
+        if not uids:
+            return
+        
+        # Select source folder to find the emails (INBOX is always selected
+        # between operations)
+        if source_folder != "INBOX":
+            self._client.select_folder(source_folder)
         
         # Ensure destination folder exists
         if not self._client.folder_exists(folder):
             self._client.create_folder(folder)
             
-        self._client.move([uid], folder)
+        self._client.move(uids, folder)
         
         # Switch back to INBOX for subsequent operations
-        self._client.select_folder("INBOX")
+        if source_folder != "INBOX":
+            self._client.select_folder("INBOX")
+    
+    def _fetch_emails(self, uids: list[int], batch_size: int) -> Iterator[Email]:
+        """FETCH messages in UID batches, yielding each batch as it arrives."""
+        uid_iter = iter(uids)
+        while batch := list(islice(uid_iter, batch_size)):
+            for uid, data in self._client.fetch(batch, ["RFC822"]).items():
+                raw = data[b"RFC822"]
+                msg = email.message_from_bytes(raw)
+                
+                yield Email(
+                    uid=uid,
+                    from_addr=self._decode_header(msg.get("From", "")),
+                    to_addr=self._decode_header(msg.get("To", "")),
+                    subject=self._decode_header(msg.get("Subject", "")),
+                    body=self._get_body(msg),
+                    date=msg.get("Date", ""),
+                    raw=raw,
+                )
     
     def _decode_header(self, header: str) -> str:
         """Decode email header."""
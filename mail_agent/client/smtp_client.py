@@ -1,14 +1,22 @@
 """SMTP client for sending/forwarding emails."""
 
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import Optional
 
 from .models import Email
 
 
 class SMTPClient:
-    """SMTP email sender."""
+    """SMTP email sender.
+
+    Without connect(), each forward opens its own connection. After
+    connect(), forwards reuse one session, reconnecting with backoff if
+    the server has dropped it.
+    """
     
     def __init__(self, host: str, port: int, address: str, password: str, use_tls: bool = True):
         self.host = host
@@ -16,6 +24,42 @@ class SMTPClient:
         self.address = address
         self.password = password
         self.use_tls = use_tls
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+    
+    def connect(self) -> None:
+        """Open a persistent SMTP session."""
+        with self._lock:
+            self._smtp = self._open()
+    
+    def disconnect(self) -> None:
+        """Close the persistent SMTP session."""
+        with self._lock:
+            if self._smtp:
+                try:
+                    self._smtp.quit()
+                except Exception:
+                    pass
+                self._smtp = None
+    
+    def __enter__(self):
+        self.connect()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disconnect()
+    
+    def noop(self) -> bool:
+        """Keep the session alive. Returns False if there is no live session."""
+        with self._lock:
+            if not self._smtp:
+                return False
+            try:
+                code, _ = self._smtp.noop()
+                return code == 250
+            except (smtplib.SMTPException, OSError):
+                self._smtp = None
+                return False
     
     def forward_email(self, original: Email, to_addr: str) -> None:
         """Forward an email to a new address."""
@@ -35,8 +79,42 @@ To: {original.to_addr}
 """
         msg.attach(MIMEText(forward_body, "plain"))
         
-        with smtplib.SMTP(self.host, self.port) as smtp:
+        with self._lock:
+            if self._smtp is None:
+                with self._open() as smtp:
+                    smtp.send_message(msg)
+                return
+            
+            try:
+                self._smtp.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, OSError):
+                self._smtp = self._reconnect()
+                self._smtp.send_message(msg)
+    
+    def _open(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP connection."""
+        smtp = smtplib.SMTP(self.host, self.port)
+        try:
             if self.use_tls:
                 smtp.starttls()
             smtp.login(self.address, self.password)
-            smtp.send_message(msg)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+    
+    def _reconnect(self, attempts: int = 3, delay: float = 0.5) -> smtplib.SMTP:
+        """Reopen the session, doubling the delay after each failure."""
+        if self._smtp is not None:
+            # Release the dead session's socket before opening a new one
+            try:
+                self._smtp.close()
+            except OSError:
+                pass
+        for attempt in range(attempts):
+            try:
+                return self._open()
+            except (smtplib.SMTPException, OSError):
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(delay * 2 ** attempt)
@@ -10,8 +10,32 @@ from .models import Config, EmailConfig, AIRoutingConfig, CompanyConfig
 from ..router.models import Rule
 
 
+# config_path -> (YAML mtime or None if missing, parsed Config)
+_cache: dict[str, tuple[int | None, Config]] = {}
+
+
 def load_config(config_path: str = "config.yaml") -> Config:
-    """Load configuration from YAML file and environment."""
+    """Load configuration from YAML file and environment.
+    
+    The result is cached and returned again until the YAML file's mtime
+    changes. Treat it as read-only.
+    """
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    
+    cached = _cache.get(config_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    config = _load_config(config_path)
+    _cache[config_path] = (mtime, config)
+    return config
+
+
+def _load_config(config_path: str) -> Config:
+    """Parse configuration from YAML file and environment."""
     load_dotenv()
     
     # Load email config from environment
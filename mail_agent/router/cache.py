@@ -0,0 +1,112 @@
+"""Cache of AI analysis results, keyed by email content."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, replace
+from typing import Optional
+
+from ..analyzer import AnalysisResult
+
+
+class AnalysisCache:
+    """LRU cache of AnalysisResults, optionally backed by SQLite.
+
+    Holds the `maxsize` most recently used results in memory. With a
+    path, results are also written to an SQLite table and read back on a
+    memory miss, so they survive restarts. Rows not stored or read for
+    `ttl` seconds are deleted, and the table is cut back to the
+    `max_rows` most recently used, when opened and every PRUNE_EVERY puts.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(
+        self,
+        maxsize: int = 2048,
+        path: Optional[str] = None,
+        max_rows: int = 50_000,
+        ttl: float = 30 * 24 * 3600,
+    ):
+        self.maxsize = maxsize
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._entries: OrderedDict[str, AnalysisResult] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._puts = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis "
+                "(key TEXT PRIMARY KEY, result TEXT NOT NULL, used REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(analysis)")}
+            if "used" not in columns:
+                # Table from before the size limit: treat its rows as new
+                self._db.execute("ALTER TABLE analysis ADD COLUMN used REAL NOT NULL DEFAULT 0")
+                self._db.execute("UPDATE analysis SET used = ?", (time.time(),))
+            self._db.execute("CREATE INDEX IF NOT EXISTS analysis_used ON analysis (used)")
+            self._prune()
+            self._db.commit()
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """Hash the given strings into a cache key."""
+        data = "\n".join(parts).encode("utf-8", errors="replace")
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        """Return a copy of the cached result, or None."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            elif self._db:
+                row = self._db.execute(
+                    "SELECT result FROM analysis WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    result = AnalysisResult(**json.loads(row[0]))
+                    self._remember(key, result)
+                    self._db.execute(
+                        "UPDATE analysis SET used = ? WHERE key = ?", (time.time(), key)
+                    )
+                    self._db.commit()
+        return self._copy(result) if result is not None else None
+
+    def put(self, key: str, result: AnalysisResult) -> None:
+        """Store a copy of a result."""
+        with self._lock:
+            self._remember(key, self._copy(result))
+            if self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis (key, result, used) VALUES (?, ?, ?)",
+                    (key, json.dumps(asdict(result)), time.time()),
+                )
+                self._puts += 1
+                if self._puts % self.PRUNE_EVERY == 0:
+                    self._prune()
+                self._db.commit()
+
+    def _prune(self) -> None:
+        """Delete expired rows, then all but the max_rows most recently used."""
+        self._db.execute("DELETE FROM analysis WHERE used < ?", (time.time() - self.ttl,))
+        self._db.execute(
+            "DELETE FROM analysis WHERE key NOT IN "
+            "(SELECT key FROM analysis ORDER BY used DESC LIMIT ?)",
+            (self.max_rows,),
+        )
+
+    def _remember(self, key: str, result: AnalysisResult) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _copy(result: AnalysisResult) -> AnalysisResult:
+        return replace(result, additional_destinations=list(result.additional_destinations))
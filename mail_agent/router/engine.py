@@ -4,8 +4,13 @@ from typing import Optional, Union
 
 from ..analyzer import GeminiAnalyzer, OllamaAnalyzer
 from ..client import Email
+from .cache import AnalysisCache
 from .models import Rule, RoutingDecision
 
+# AI results below this confidence are not forwarded automatically, and
+# are not cached either, so they get a fresh analysis next time
+FORWARD_CONFIDENCE = 0.7
+
 
 class Router:
     """Email routing decision engine."""
@@ -19,12 +24,17 @@ class Router:
         ai_destinations: list[dict] = None,
         default_action: str = "analyze",
         company_name: str = "TechCorp Industries",
-        company_mailbox: str = "company@mail.local"
+        company_mailbox: str = "company@mail.local",
+        ai_cache_path: Optional[str] = None,
     ):
         self.rules = rules
         self.default_action = default_action
         self._analyzer: Optional[Union[GeminiAnalyzer, OllamaAnalyzer]] = None
         
+        # Identical emails (newsletter blasts, notifications) reuse the
+        # earlier AI answer
+        self._cache = AnalysisCache(path=ai_cache_path)
+        
         # Prefer Ollama if configured, fall back to Gemini
         if ai_enabled:
             if ollama_model:
@@ -36,6 +46,14 @@ class Router:
                 )
             elif gemini_api_key:
                 self._analyzer = GeminiAnalyzer(gemini_api_key, ai_destinations or [])
+        
+        # The provider, model and destinations are part of the key because
+        # they change what the answer can be
+        self._cache_salt = repr((
+            type(self._analyzer).__name__,
+            getattr(self._analyzer, "model", getattr(self._analyzer, "MODEL", "")),
+            ai_destinations or [],
+        ))
     
     def decide(self, email: Email) -> RoutingDecision:
         """Decide where to route an email."""
@@ -54,12 +72,17 @@ class Router:
         
         # Fall back to AI if enabled
         if self._analyzer and self.default_action in ("analyze", "ai_route"):
-            ai_result = self._analyzer.analyze(email_data)
+            key = self._cache.key(self._cache_salt, email.from_addr, email.subject, email.body)
+            ai_result = self._cache.get(key)
+            if ai_result is None:
+                ai_result = self._analyzer.analyze(email_data)
+                if ai_result.confidence >= FORWARD_CONFIDENCE:
+                    self._cache.put(key, ai_result)
             return RoutingDecision(
                 forward_to=ai_result.forward_to,
                 matched_rule=None,
                 ai_result=ai_result,
-                should_forward=bool(ai_result.forward_to) and ai_result.confidence >= 0.7,
+                should_forward=bool(ai_result.forward_to) and ai_result.confidence >= FORWARD_CONFIDENCE,
                 additional_destinations=ai_result.additional_destinations,
             )
         
@@ -15,24 +15,31 @@ class Rule:
     match_keywords: Optional[list[str]] = None
     forward_to: str = ""
     
+    def __post_init__(self):
+        # Lowercase the patterns once rather than on every match
+        self._from = self.match_from.replace("*", "").lower() if self.match_from else ""
+        self._subject_kws = tuple(kw.lower() for kw in self.match_subject or ())
+        self._keywords = tuple(kw.lower() for kw in self.match_keywords or ())
+    
     def matches(self, email_data: dict) -> bool:
         """Check if email matches this rule."""
-        if self.match_from:
+        if self._from:
             sender = email_data.get("from", "").lower()
-            pattern = self.match_from.replace("*", "").lower()
-            if pattern not in sender:
+            if self._from not in sender:
                 return False
         
-        if self.match_subject:
+        subject = None
+        if self._subject_kws:
             subject = email_data.get("subject", "").lower()
-            if not any(kw.lower() in subject for kw in self.match_subject):
+            if not any(kw in subject for kw in self._subject_kws):
                 return False
         
-        if self.match_keywords:
+        if self._keywords:
+            if subject is None:
+                subject = email_data.get("subject", "").lower()
             body = email_data.get("body", "").lower()
-            subject = email_data.get("subject", "").lower()
             text = f"{subject} {body}"
-            if not any(kw.lower() in text for kw in self.match_keywords):
+            if not any(kw in text for kw in self._keywords):
                 return False
         
         return True
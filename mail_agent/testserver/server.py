@@ -4,24 +4,32 @@ This module provides a simple IMAP/SMTP test server that stores emails in memory
 Useful for testing the mail agent without connecting to a real mail server.
 """
 
-import asyncio
-import email
-import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from email.mime.text import MIMEText
+from email.parser import BytesParser
 from typing import Optional
-import socket
 
+from ..client import Email
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class StoredEmail:
-    """Email stored in the test server."""
+    """Email stored in the test server.
+
+    Frozen and slotted to keep per-message overhead low; flags is still a
+    mutable set and is updated in place.
+    """
     uid: int
     raw: bytes
     flags: set = field(default_factory=set)
 
 
+# Shared parser instance; avoids rebuilding the parser for every message
+_parser = BytesParser()
+
+
 class TestMailServer:
     """Simple in-memory test mail server with IMAP and SMTP support.
     
@@ -29,15 +37,19 @@ class TestMailServer:
     It stores all emails in memory and provides basic IMAP/SMTP interfaces.
     """
     
-    def __init__(self, imap_port: int = 10143, smtp_port: int = 10025):
+    def __init__(
+        self,
+        imap_port: int = 10143,
+        smtp_port: int = 10025,
+        max_emails: Optional[int] = None,
+    ):
         self.imap_port = imap_port
         self.smtp_port = smtp_port
-        self.emails: list[StoredEmail] = []
+        # Bounded when max_emails is set: oldest emails are evicted first
+        self.emails: deque[StoredEmail] = deque(maxlen=max_emails)
+        self._by_uid: dict[int, StoredEmail] = {}
         self.uid_counter = 1
         self._running = False
-        self._imap_server: Optional[socket.socket] = None
-        self._smtp_server: Optional[socket.socket] = None
-        self._threads: list[threading.Thread] = []
     
     def add_test_email(
         self, 
@@ -57,16 +69,17 @@ class TestMailServer:
             uid=self.uid_counter,
             raw=msg.as_bytes(),
         )
+        if self.emails.maxlen is not None and len(self.emails) == self.emails.maxlen:
+            evicted = self.emails.popleft()
+            self._by_uid.pop(evicted.uid, None)
         self.emails.append(stored)
+        self._by_uid[stored.uid] = stored
         self.uid_counter += 1
         return stored.uid
     
     def get_email(self, uid: int) -> Optional[StoredEmail]:
         """Get an email by UID."""
-        for email in self.emails:
-            if email.uid == uid:
-                return email
-        return None
+        return self._by_uid.get(uid)
     
     def mark_as_read(self, uid: int) -> bool:
         """Mark an email as read."""
@@ -83,6 +96,7 @@ class TestMailServer:
     def clear(self) -> None:
         """Clear all emails."""
         self.emails.clear()
+        self._by_uid.clear()
         self.uid_counter = 1
     
     def start(self) -> None:
@@ -132,18 +146,18 @@ class TestIMAPClient:
         if not self._connected:
             raise RuntimeError("Not connected")
         
-        from ..client import Email
-        
         for stored in self.server.get_unread():
-            msg = email.message_from_bytes(stored.raw)
+            msg = _parser.parsebytes(stored.raw)
+            # Walk the header list once; first occurrence wins, like Message.get
+            headers = {name.lower(): value for name, value in reversed(msg.items())}
             
             yield Email(
                 uid=stored.uid,
-                from_addr=msg.get("From", ""),
-                to_addr=msg.get("To", ""),
-                subject=msg.get("Subject", ""),
+                from_addr=headers.get("from", ""),
+                to_addr=headers.get("to", ""),
+                subject=headers.get("subject", ""),
                 body=self._get_body(msg),
-                date=msg.get("Date", ""),
+                date=headers.get("date", ""),
                 raw=stored.raw,
             )
     
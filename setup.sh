@@ -156,6 +156,18 @@ setup_python_env() {
     .venv/bin/pip install --quiet --upgrade pip
     .venv/bin/pip install --quiet -r requirements.txt
     print_success "Python dependencies installed"
+    
+    # Serve the Socket.IO client locally instead of from the CDN
+    if [ ! -f "static/socket.io-4.7.2.msgpack.min.js" ]; then
+        print_step "Downloading Socket.IO client..."
+        mkdir -p static
+        if curl -sSf https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.7.2/socket.io.msgpack.min.js -o static/socket.io-4.7.2.msgpack.min.js; then
+            print_success "Socket.IO client saved to static/"
+        else
+            rm -f static/socket.io-4.7.2.msgpack.min.js
+            print_warning "Could not download Socket.IO client; dashboard will use the CDN"
+        fi
+    fi
 }
 
 # -----------------------------------------------------------------------------
@@ -0,0 +1,57 @@
+"""
+Helpers shared by the unit test modules.
+"""
+import functools
+import json
+import re
+from types import MappingProxyType
+
+# Decoder for tests that only check the parsed value. Tests of error
+# handling stay on json.loads, since they assert json.JSONDecodeError.
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+
+def _extract_md_json(s):
+    """Return the JSON inside a ```json fenced block, or the stripped text.
+    
+    Bare JSON (the usual case) costs a single find() with no allocation.
+    """
+    i = s.find('```json')
+    if i < 0:
+        return s.strip()
+    start = i + 7
+    j = s.find('```', start)
+    return s[start:j].strip() if j > 0 else s[start:].strip()
+
+
+
+def compile_keywords(keywords):
+    """One case-insensitive alternation per category, in order.
+    
+    Keywords match anywhere in the text, like the `kw in text.lower()`
+    checks they replace.
+    """
+    return [
+        (category, re.compile('|'.join(map(re.escape, kws)), re.I))
+        for category, kws in keywords.items()
+    ]
+
+# What a response that does not parse falls back to
+_REVIEW_FALLBACK = MappingProxyType({"category": "review", "confidence": 0.0})
+
+
+@functools.lru_cache(maxsize=256)
+def try_json(s):
+    """Parse s, or return the review fallback if it is empty or invalid.
+    
+    Results are cached and shared, so they are returned read-only.
+    """
+    if not s:
+        return _REVIEW_FALLBACK
+    try:
+        return MappingProxyType(json.loads(s))
+    except json.JSONDecodeError:
+        return _REVIEW_FALLBACK
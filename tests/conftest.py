@@ -0,0 +1,75 @@
+"""
+Shared fixtures and markers for the unit tests.
+
+The fixtures are read-only, so they are built once per session and stored
+in immutable containers to keep one test from leaking changes into another.
+"""
+from email.message import EmailMessage
+from types import MappingProxyType
+
+import pytest
+
+
+# Modules whose tests are pure computation: no I/O, no shared state, so
+# they are safe to spread across pytest-xdist workers
+FAST_MODULES = {"test_analyzer.py", "test_client.py", "test_clear_mailboxes.py", "test_router.py"}
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "fast: CPU-only tests safe for parallel runs")
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        if item.path.name in FAST_MODULES:
+            item.add_marker(pytest.mark.fast)
+
+
+@pytest.fixture(scope="session")
+def valid_categories():
+    """Set of valid categories."""
+    return frozenset({"support", "sales", "hr", "legal", "it", "promotions", "vendors"})
+
+
+@pytest.fixture(scope="session")
+def keywords_config():
+    """Keyword configuration for fallback matching."""
+    return MappingProxyType({
+        "support": ("help", "issue", "problem", "broken"),
+        "sales": ("buy", "purchase", "pricing", "quote"),
+        "hr": ("resume", "job", "application", "hiring"),
+    })
+
+
+@pytest.fixture(scope="session")
+def category_config():
+    """Sample category configuration."""
+    return MappingProxyType({
+        "support": MappingProxyType({
+            "target": "support@mail.local",
+            "keywords": ("help", "issue", "problem"),
+        }),
+        "sales": MappingProxyType({
+            "target": "sales@mail.local",
+            "keywords": ("purchase", "quote", "pricing"),
+        }),
+        "hr": MappingProxyType({
+            "target": "hr@mail.local",
+            "keywords": ("resume", "application", "job"),
+        }),
+    })
+
+
+@pytest.fixture(scope="session")
+def threshold():
+    """Default confidence threshold."""
+    return 0.7
+
+
+@pytest.fixture(scope="session")
+def email_factory():
+    """Return a factory for empty EmailMessages, one fresh message per call.
+    
+    Messages carry no headers or body the test didn't set itself.
+    """
+    return EmailMessage
@@ -0,0 +1,130 @@
+"""
+Tests for the AI analysis cache and how the router keys it.
+"""
+import sqlite3
+
+import pytest
+
+from mail_agent.analyzer import AnalysisResult
+from mail_agent.client import Email
+from mail_agent.router.cache import AnalysisCache
+from mail_agent.router.engine import Router
+
+
+def make_result(category="support", confidence=0.9):
+    return AnalysisResult(forward_to="support@x", category=category, confidence=confidence,
+                          reasoning="r", additional_destinations=["sales@x"])
+
+
+def row_count(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+
+
+def test_miss_then_hit():
+    cache = AnalysisCache()
+    key = cache.key("a", "b")
+    assert cache.get(key) is None
+
+    cache.put(key, make_result())
+    assert cache.get(key) == make_result()
+
+
+def test_hit_is_a_copy():
+    """Callers can change a result without changing the cached one."""
+    cache = AnalysisCache()
+    cache.put("k", make_result())
+    cache.get("k").additional_destinations.append("hr@x")
+    assert cache.get("k").additional_destinations == ["sales@x"]
+
+
+def test_memory_eviction_is_lru():
+    cache = AnalysisCache(maxsize=2)
+    cache.put("a", make_result("a"))
+    cache.put("b", make_result("b"))
+    cache.get("a")
+    cache.put("c", make_result("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").category == "a"
+    assert cache.get("c").category == "c"
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    AnalysisCache(path=path).put("k", make_result())
+
+    assert AnalysisCache(path=path).get("k") == make_result()
+
+
+def test_disk_rows_limited(tmp_path, monkeypatch):
+    """The table is cut back to max_rows, keeping the most recently used."""
+    monkeypatch.setattr(AnalysisCache, "PRUNE_EVERY", 5)
+    path = str(tmp_path / "cache.sqlite3")
+    cache = AnalysisCache(maxsize=1, path=path, max_rows=3)
+    for i in range(10):
+        cache.put(str(i), make_result(str(i)))
+
+    assert row_count(path) == 3
+    assert AnalysisCache(path=path).get("9").category == "9"
+    assert AnalysisCache(path=path).get("0") is None
+
+
+def test_disk_rows_expire(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    AnalysisCache(path=path).put("k", make_result())
+
+    assert AnalysisCache(path=path, ttl=-1).get("k") is None
+    assert row_count(path) == 0
+
+
+class CountingAnalyzer:
+    """Analyzer stand-in that counts the calls that reach it."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def analyze(self, email_data):
+        self.calls += 1
+        return make_result()
+
+
+def test_router_key_changes_with_destinations():
+    """Same email, different destinations: the cached answer is not reused."""
+    email = Email(uid=1, from_addr="a@b", to_addr="me@x", subject="s", body="b", date="", raw=b"")
+    analyzer = CountingAnalyzer()
+    routers = [Router(rules=[], ai_destinations=[{"email": addr}]) for addr in ("x@y", "z@y")]
+    shared = routers[0]._cache
+    for router in routers:
+        router._analyzer = analyzer
+        router._cache = shared
+
+    routers[0].decide(email)
+    routers[0].decide(email)
+    assert analyzer.calls == 1
+
+    routers[1].decide(email)
+    assert analyzer.calls == 2
+
+
+
+def test_router_key_changes_with_model():
+    """Same email and destinations, another model: the cached answer is not reused."""
+    email = Email(uid=1, from_addr="a@b", to_addr="me@x", subject="s", body="b", date="", raw=b"")
+    analyzer = CountingAnalyzer()
+    routers = [Router(rules=[], ai_enabled=True, ollama_model=model, ai_destinations=[{"email": "x@y"}])
+               for model in ("model-a", "model-b")]
+    shared = routers[0]._cache
+    for router in routers:
+        router._analyzer.analyze = analyzer.analyze
+        router._cache = shared
+
+    routers[0].decide(email)
+    routers[0].decide(email)
+    assert analyzer.calls == 1
+
+    routers[1].decide(email)
+    assert analyzer.calls == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,64 @@
+"""
+Tests for folding message ids into IMAP sequence sets.
+"""
+import pytest
+
+from testserver.clear_mailboxes import build_sequence_sets, get_message_counts
+
+
+def test_empty():
+    assert build_sequence_sets([]) == []
+
+
+def test_single_message():
+    assert build_sequence_sets([7]) == ['7']
+
+
+def test_contiguous_runs():
+    """Runs collapse to lo:hi; input order and duplicates do not matter."""
+    assert build_sequence_sets([5, 1, 2, 3, 3, 9, 10, 12]) == ['1:3,5,9:10,12']
+
+
+def test_chunks_stay_under_max_len():
+    ids = range(1, 2000, 2)  # no runs: one part per id
+    chunks = build_sequence_sets(ids, max_len=50)
+
+    assert len(chunks) > 1
+    assert all(len(c) <= 50 for c in chunks)
+    assert [int(p) for c in chunks for p in c.split(',')] == list(ids)
+
+
+def test_part_longer_than_max_len_gets_own_chunk():
+    assert build_sequence_sets([1, 100000, 100001], max_len=5) == ['1', '100000:100001']
+
+
+class FakeIMAP:
+    """imaplib stand-in answering LIST-STATUS with fixed untagged lines."""
+
+    capabilities = ('IMAP4REV1', 'LIST-STATUS')
+
+    def __init__(self, statuses=None, error=None):
+        self.statuses = statuses
+        self.error = error
+
+    def _simple_command(self, *args):
+        if self.error:
+            raise self.error
+        return 'OK', [b'done']
+
+    def _untagged_response(self, typ, dat, name):
+        return typ, self.statuses
+
+
+def test_message_counts_skip_unparsed_lines():
+    """Tuple (literal) and unmatched lines are left out, so their count is unknown."""
+    imap = FakeIMAP([b'"INBOX" (MESSAGES 3)', (b'{6}', b'Review'), b'garbage', None])
+    assert get_message_counts(imap) == {'INBOX': 3}
+
+
+def test_message_counts_none_on_failure():
+    assert get_message_counts(FakeIMAP(error=OSError('boom'))) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -2,16 +2,26 @@
 Unit tests for the email client module.
 """
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from email.message import EmailMessage
+from email.utils import parseaddr
+
+
+def plain_payload(msg):
+    """Return the transfer-decoded bytes of the first text/plain part.
+    
+    Works on single-part messages too, and skips the charset decode to str.
+    """
+    for part in msg.walk():
+        if part.get_content_type() == 'text/plain':
+            return part.get_payload(decode=True) or b''
+    return b''
 
 
 class TestEmailMessage:
     """Tests for email message handling."""
     
-    def test_create_email_message(self):
+    def test_create_email_message(self, email_factory):
         """Test creating a basic email message."""
-        msg = EmailMessage()
+        msg = email_factory()
         msg['Subject'] = 'Test Subject'
         msg['From'] = 'sender@example.com'
         msg['To'] = 'receiver@example.com'
@@ -21,31 +31,28 @@ class TestEmailMessage:
         assert msg['From'] == 'sender@example.com'
         assert msg['To'] == 'receiver@example.com'
     
-    def test_extract_email_body(self):
+    def test_extract_email_body(self, email_factory):
         """Test extracting body from email message."""
-        msg = EmailMessage()
+        msg = email_factory()
         msg.set_content('This is the email body content')
         
         body = msg.get_content()
         
         assert 'email body content' in body
     
-    def test_handle_multipart_email(self):
+    def test_handle_multipart_email(self, email_factory):
         """Test handling multipart email (text + html)."""
         # Create multipart message
-        msg = EmailMessage()
+        msg = email_factory()
         msg['Subject'] = 'Multipart Test'
         msg.set_content('Plain text version')
+        msg.add_alternative('<p>HTML version</p>', subtype='html')
         
-        # Get the text content
-        if msg.is_multipart():
-            for part in msg.iter_parts():
-                if part.get_content_type() == 'text/plain':
-                    body = part.get_content()
-        else:
-            body = msg.get_content()
+        body = plain_payload(msg)
         
-        assert 'Plain text' in body
+        assert msg.is_multipart()
+        assert b'Plain text' in body
+        assert b'HTML' not in body
 
 
 class TestIMAPOperations:
@@ -62,16 +69,17 @@ class TestIMAPOperations:
         # Simulated IMAP search response
         response_data = b'1 2 3 4 5'
         
-        uids = response_data.decode().split()
+        # UIDs are ASCII digits, so split the bytes without decoding
+        uids = response_data.split()
         
-        assert uids == ['1', '2', '3', '4', '5']
+        assert uids == [b'1', b'2', b'3', b'4', b'5']
         assert len(uids) == 5
     
     def test_handle_empty_search(self):
         """Test handling empty search results."""
         response_data = b''
         
-        uids = response_data.decode().split() if response_data else []
+        uids = response_data.split()
         
         assert uids == []
 
@@ -79,9 +87,9 @@ class TestIMAPOperations:
 class TestSMTPOperations:
     """Tests for SMTP operations (mocked)."""
     
-    def test_smtp_message_format(self):
+    def test_smtp_message_format(self, email_factory):
         """Test message formatting for SMTP."""
-        msg = EmailMessage()
+        msg = email_factory()
         msg['Subject'] = 'Forwarded: Original Subject'
         msg['From'] = 'system@mail.local'
         msg['To'] = 'support@mail.local'
@@ -161,11 +169,7 @@ class TestEmailParsing:
         """Test extracting email from 'Name <email>' format."""
         from_header = 'John Doe <john@example.com>'
         
-        # Extract email using simple parsing
-        if '<' in from_header and '>' in from_header:
-            email = from_header.split('<')[1].split('>')[0]
-        else:
-            email = from_header
+        email = parseaddr(from_header)[1] or from_header
         
         assert email == 'john@example.com'
     
@@ -173,32 +177,33 @@ class TestEmailParsing:
         """Test extracting plain email address."""
         from_header = 'john@example.com'
         
-        if '<' in from_header and '>' in from_header:
-            email = from_header.split('<')[1].split('>')[0]
-        else:
-            email = from_header
+        email = parseaddr(from_header)[1] or from_header
         
         assert email == 'john@example.com'
 
 
+class MockClient:
+    """Context-managed client that records connect and cleanup."""
+    
+    def __init__(self):
+        self.connected = False
+        self.cleanup_called = False
+    
+    def __enter__(self):
+        self.connected = True
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.connected = False
+        self.cleanup_called = True
+        return False  # Don't suppress exceptions
+
+
 class TestContextManager:
     """Tests for context manager behavior."""
     
     def test_context_manager_pattern(self):
         """Test context manager enter/exit pattern."""
-        
-        class MockClient:
-            def __init__(self):
-                self.connected = False
-            
-            def __enter__(self):
-                self.connected = True
-                return self
-            
-            def __exit__(self, *args):
-                self.connected = False
-        
-        # Test context manager
         with MockClient() as client:
             assert client.connected is True
         
@@ -206,18 +211,6 @@ class TestContextManager:
     
     def test_exception_handling_in_context(self):
         """Test that context manager handles exceptions."""
-        
-        class MockClient:
-            def __init__(self):
-                self.cleanup_called = False
-            
-            def __enter__(self):
-                return self
-            
-            def __exit__(self, exc_type, exc_val, exc_tb):
-                self.cleanup_called = True
-                return False  # Don't suppress exceptions
-        
         client = MockClient()
         
         try:
@@ -229,37 +222,34 @@ class TestContextManager:
         assert client.cleanup_called is True
 
 
+# User-facing message per connection error
+ERROR_MESSAGES = {
+    "ConnectionRefusedError": "Mail server unavailable",
+    "AuthError": "Invalid credentials",
+    "Timeout": "Connection timed out after {timeout}s",
+}
+
+
+def handle_error(error_type, timeout=30):
+    """Build the error result for an error type with a single table lookup."""
+    message = ERROR_MESSAGES.get(error_type, "Unknown error").format(timeout=timeout)
+    return {"status": "error", "message": message}
+
+
 class TestErrorHandling:
     """Tests for error handling."""
     
-    def test_handle_connection_refused(self):
-        """Test handling connection refused error."""
-        error_occurred = True
-        error_type = "ConnectionRefusedError"
-        
-        if error_occurred and error_type == "ConnectionRefusedError":
-            result = {"status": "error", "message": "Mail server unavailable"}
-        
-        assert result["status"] == "error"
-    
-    def test_handle_authentication_error(self):
-        """Test handling authentication error."""
-        auth_failed = True
-        
-        if auth_failed:
-            result = {"status": "error", "message": "Invalid credentials"}
-        
-        assert "Invalid credentials" in result["message"]
-    
-    def test_handle_timeout(self):
-        """Test handling connection timeout."""
-        timeout_seconds = 30
-        timed_out = True
-        
-        if timed_out:
-            result = {"status": "error", "message": f"Connection timed out after {timeout_seconds}s"}
-        
-        assert "timed out" in result["message"]
+    @pytest.mark.parametrize("error_type,expected", [
+        ("ConnectionRefusedError", "Mail server unavailable"),
+        ("AuthError", "Invalid credentials"),
+        ("Timeout", "Connection timed out after 30s"),
+        ("SomethingElse", "Unknown error"),
+    ])
+    def test_handle_error(self, error_type, expected):
+        """Test the result built for each connection error."""
+        result = handle_error(error_type)
+        
+        assert result == {"status": "error", "message": expected}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+"""
+Tests for the web dashboard's processing cycle (mail server and AI mocked).
+"""
+from collections import deque
+
+import pytest
+
+web_dashboard = pytest.importorskip("web_dashboard")
+
+from mail_agent.analyzer.models import AnalysisResult
+from mail_agent.client.models import Email
+from mail_agent.config.models import AIRoutingConfig, Config, EmailConfig
+from mail_agent.router.models import RoutingDecision
+
+
+class FakeIMAP:
+    """IMAPClient stand-in serving a fixed INBOX and recording moves."""
+
+    inbox = []
+    moves = []
+
+    def __init__(self, **kwargs):
+        self._client = self
+
+    def folder_exists(self, folder):
+        return True
+
+    def connect(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def noop(self):
+        return True
+
+    def fetch_from_folder(self, folder, *args, **kwargs):
+        return []
+
+    def fetch_unread(self, *args, **kwargs):
+        return iter(FakeIMAP.inbox)
+
+    def move_emails(self, uids, folder, source_folder="INBOX"):
+        FakeIMAP.moves.append((list(uids), folder))
+
+    def move_email(self, uid, folder, source_folder="INBOX"):
+        FakeIMAP.moves.append(([uid], folder))
+
+
+class FakeRouter:
+    """Router stand-in sending every email to review."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def decide(self, email):
+        result = AnalysisResult(category="support", confidence=0.5, reasoning="r", forward_to="support@x")
+        return RoutingDecision(forward_to="support@x", matched_rule=None, ai_result=result, should_forward=True)
+
+
+@pytest.fixture
+def dashboard(monkeypatch, tmp_path):
+    """web_dashboard with fresh state and fakes for IMAP, the router and I/O."""
+    w = web_dashboard
+    monkeypatch.setattr(w, "emails_data", deque(maxlen=w.emails_data.maxlen))
+    monkeypatch.setattr(w, "emails_by_uid", {})
+    monkeypatch.setattr(w, "pending_reviews", {})
+    monkeypatch.setattr(w, "_dirty_emails", {})
+    monkeypatch.setattr(w, "_removed_uids", [])
+    monkeypatch.setattr(w, "_imap_pool", {})
+    monkeypatch.setattr(w, "_imap_keepalive_started", True)
+    monkeypatch.setattr(w, "_router", None)
+    monkeypatch.setattr(w, "BODY_DIR", tmp_path / "bodies")
+    monkeypatch.setattr(w, "IMAPClient", FakeIMAP)
+    monkeypatch.setattr(w, "Router", FakeRouter)
+    monkeypatch.setattr(w, "term_print", lambda *args, **kwargs: None)
+    monkeypatch.setattr(w, "log_action", lambda *args, **kwargs: None)
+    monkeypatch.setattr(w, "config", Config(
+        email=EmailConfig("imap", 1, "smtp", 2, "me@x", "pw"),
+        rules=[],
+        ai_routing=AIRoutingConfig(),
+    ))
+    FakeIMAP.inbox = []
+    FakeIMAP.moves = []
+    return w
+
+
+def make_email(uid):
+    return Email(uid=uid, from_addr="a@b", to_addr="me@x", subject=f"Mail {uid}",
+                 body=f"body {uid}", date="", raw=b"")
+
+
+def test_cycle_larger_than_tracking_limit(dashboard):
+    """Every email of an oversized cycle is processed, none evicted."""
+    count = dashboard.MAX_TRACKED_EMAILS + 1
+    FakeIMAP.inbox = [make_email(uid) for uid in range(count)]
+
+    dashboard.process_emails()
+
+    assert FakeIMAP.moves == [(list(range(count)), "Review")]
+    assert len(dashboard.pending_reviews) == count
+    assert all(dashboard.get_email(uid).status == "Review" for uid in range(count))
+    assert dashboard.load_body(0) == "body 0"
+
+
+def test_eviction_skips_pending_reviews(dashboard):
+    """Once over the limit, the oldest email not awaiting review is dropped."""
+    limit = dashboard.MAX_TRACKED_EMAILS
+    dashboard.pending_reviews[0] = {"email": None, "decision": None, "folder": "INBOX"}
+    for uid in range(limit + 1):
+        dashboard.upsert_emails([dashboard.EmailStatus(uid=uid, from_addr="a@b", subject="s")])
+
+    assert len(dashboard.emails_data) == limit
+    assert dashboard.get_email(0) is not None
+    assert dashboard.get_email(1) is None
+    assert dashboard._removed_uids == [1]
+
+
+def test_eviction_is_sent_to_clients(dashboard, monkeypatch):
+    sent = []
+    monkeypatch.setattr(dashboard.socketio, "emit", lambda event, data, **kwargs: sent.append((event, data)))
+    limit = dashboard.MAX_TRACKED_EMAILS
+    dashboard.upsert_emails([dashboard.EmailStatus(uid=uid, from_addr="a@b", subject="s") for uid in range(limit)])
+    dashboard.flush_email_updates()  # nothing queued yet
+    dashboard.upsert_emails([dashboard.EmailStatus(uid=limit, from_addr="a@b", subject="s")])
+
+    dashboard.flush_email_updates()
+
+    assert sent == [("email_updates", {"seq": 1, "emails": [], "removed": [0]})]
+
+
+def test_update_keeps_tracked_object_and_index(dashboard):
+    """Upserting a tracked UID updates it in place without a new index."""
+    first, = dashboard.upsert_emails([dashboard.EmailStatus(uid=1, from_addr="a@b", subject="old")])
+    index = dashboard.emails_by_uid
+
+    again, = dashboard.upsert_emails([dashboard.EmailStatus(uid=1, from_addr="a@b", subject="new")])
+
+    assert again is first and first.subject == "new"
+    assert dashboard.emails_by_uid is index
+    assert list(dashboard.emails_data) == [first]
+
+
+def test_reject_deletes_body(dashboard):
+    """A rejected review's body file is removed from its folder's directory."""
+    FakeIMAP.inbox = [make_email(7)]
+    dashboard.process_emails()
+    body_file = dashboard.BODY_DIR / "INBOX" / "7.txt"
+    assert body_file.read_text() == "body 7"
+
+    dashboard.reject_email({"uid": 7})
+
+    assert 7 not in dashboard.pending_reviews
+    assert not body_file.exists()
+    assert dashboard.get_email(7).status == "Skipped"
@@ -0,0 +1,38 @@
+"""
+Tests for the background writer of the email logger.
+"""
+import json
+
+import pytest
+
+from email_logger import EmailLogger
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_close_drains_queue(tmp_path):
+    """close() returns only after every queued entry is on disk."""
+    logger = EmailLogger(log_dir=tmp_path, session_id="s", background=True)
+    for uid in range(500):
+        logger.log_action(uid, "approved")
+    logger.close()
+
+    assert [r["uid"] for r in read_lines(logger.actions_file)] == list(range(500))
+
+
+def test_bad_record_does_not_stop_writer(tmp_path, capsys):
+    """An unserializable record is reported and the next ones still land."""
+    logger = EmailLogger(log_dir=tmp_path, session_id="s", background=True)
+    logger.log_action(1, "approved")
+    logger._append(logger.actions_file, {"uid": 2, "bad": object()})
+    logger.log_action(3, "rejected")
+    logger.close()
+
+    assert [r["uid"] for r in read_lines(logger.actions_file)] == [1, 3]
+    assert "could not write" in capsys.readouterr().err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -5,6 +5,7 @@ import os
 import re
 import sys
 import glob
+import tempfile
 
 # Auto-detect Thunderbird profile
 profile_matches = glob.glob(os.path.expanduser("~/.thunderbird/*.default-release"))
@@ -16,6 +17,7 @@ PREFS_FILE = os.path.join(PROFILE_PATH, "prefs.js")
 
 # Source account to clone from (add this manually first!)
 SOURCE_EMAIL = "deniz@mail.local"
+SOURCE_VALUE = f'"{SOURCE_EMAIL}"'.encode()  # as it appears in prefs.js
 
 # New accounts to create (email, password, display_name)
 NEW_ACCOUNTS = [
@@ -29,66 +31,92 @@ NEW_ACCOUNTS = [
     ("promotions@mail.local", "promotions01", "Promotions"),
 ]
 
+# Every numbered server/identity/SMTP/account pref and the two key lists,
+# matched in one pass: (kind, number, key, value, list name, list value).
+# prefs.js is handled as bytes throughout, so it is never decoded.
+_PREFS_RE = re.compile(
+    rb'user_pref\("mail\.(server\.server|identity\.id|smtpserver\.smtp|account\.account)(\d+)\.([^"]*)"'
+    rb'(?:, ([^)]+)\);)?'
+    rb'|user_pref\("mail\.(accountmanager\.accounts|smtpservers)", "([^"]*)"\);'
+)
+_KEY_RE = re.compile(rb'\w+')
+
+def parse_prefs(content):
+    """Index prefs.js in a single scan.
+    
+    Returns (prefs, lists). prefs maps each kind ("server.server",
+    "identity.id", "smtpserver.smtp", "account.account") to
+    {number: {key: value}} in file order, keys and values as bytes; lists maps
+    "accountmanager.accounts" and "smtpservers" to the (start, end) span
+    of their value in content.
+    """
+    prefs = {"server.server": {}, "identity.id": {}, "smtpserver.smtp": {}, "account.account": {}}
+    lists = {}
+    for match in _PREFS_RE.finditer(content):
+        kind, num, key, value, list_name, _ = match.groups()
+        if kind:
+            entry = prefs[kind.decode()].setdefault(int(num), {})
+            if value is not None and _KEY_RE.fullmatch(key):
+                entry[key] = value
+        elif (list_name := list_name.decode()) not in lists:
+            lists[list_name] = match.span(6)
+    return prefs, lists
+
+def find_by_value(entries, key, value):
+    """Number of the first entry whose `key` pref is exactly value, or None."""
+    return next((num for num, entry in entries.items() if entry.get(key) == value), None)
+
 def main():
     print("⚠️  Close Thunderbird before running this script!")
     print(f"Make sure '{SOURCE_EMAIL}' account exists in Thunderbird first.")
     input("Press Enter when ready...")
     
     # Read prefs
-    with open(PREFS_FILE, "r") as f:
+    with open(PREFS_FILE, "rb") as f:
         content = f.read()
     
+    # Re-runs usually have nothing to add; a plain substring probe for each
+    # account's exact login pref settles that before any parsing
+    if all(f'.userName", "{email}");'.encode() in content for email, _, _ in NEW_ACCOUNTS):
+        for email, _, _ in NEW_ACCOUNTS:
+            print(f"⏭ Skipping {email} (already exists)")
+        print("\n✓ All accounts already exist, nothing to do!")
+        return
+    
+    prefs, lists = parse_prefs(content)
+    servers = prefs["server.server"]
+    identities = prefs["identity.id"]
+    smtps = prefs["smtpserver.smtp"]
+    
     # Find source account details
-    server_match = re.search(rf'mail\.server\.(server\d+)\.userName.*{re.escape(SOURCE_EMAIL)}', content)
-    if not server_match:
+    server_num = find_by_value(servers, b"userName", SOURCE_VALUE)
+    if server_num is None:
         print(f"✗ Could not find account for {SOURCE_EMAIL}")
         print("  Add it manually in Thunderbird first!")
         sys.exit(1)
     
-    source_server = server_match.group(1)
+    source_server = f"server{server_num}"
     print(f"Found source: {source_server}")
     
-    # Extract all source server settings
-    server_prefs = {}
-    for match in re.finditer(rf'user_pref\("mail\.server\.{source_server}\.(\w+)", ([^)]+)\);', content):
-        key, value = match.groups()
-        server_prefs[key] = value
-    
-    # Find source identity
-    identity_match = re.search(rf'mail\.identity\.(id\d+)\.useremail.*{re.escape(SOURCE_EMAIL)}', content)
-    if identity_match:
-        source_identity = identity_match.group(1)
-        identity_prefs = {}
-        for match in re.finditer(rf'user_pref\("mail\.identity\.{source_identity}\.(\w+)", ([^)]+)\);', content):
-            key, value = match.groups()
-            identity_prefs[key] = value
-    else:
-        identity_prefs = {}
+    # Source server, identity and SMTP settings
+    server_prefs = servers[server_num]
+    identity_num = find_by_value(identities, b"useremail", SOURCE_VALUE)
+    identity_prefs = identities[identity_num] if identity_num is not None else {}
+    smtp_num = find_by_value(smtps, b"username", SOURCE_VALUE)
+    smtp_prefs = smtps[smtp_num] if smtp_num is not None else {}
     
-    # Find source SMTP
-    smtp_match = re.search(rf'mail\.smtpserver\.(smtp\d+)\.username.*{re.escape(SOURCE_EMAIL)}', content)
-    if smtp_match:
-        source_smtp = smtp_match.group(1)
-        smtp_prefs = {}
-        for match in re.finditer(rf'user_pref\("mail\.smtpserver\.{source_smtp}\.(\w+)", ([^)]+)\);', content):
-            key, value = match.groups()
-            smtp_prefs[key] = value
-    else:
-        smtp_prefs = {}
+    # Accounts already in the profile, by login
+    existing_emails = {entry[b"userName"].strip(b'"') for entry in servers.values() if b"userName" in entry}
     
-    # Find highest existing numbers
-    all_servers = [int(x) for x in re.findall(r'mail\.server\.server(\d+)', content)]
-    all_identities = [int(x) for x in re.findall(r'mail\.identity\.id(\d+)', content)]
-    all_accounts = [int(x) for x in re.findall(r'mail\.account\.account(\d+)', content)]
-    all_smtps = [int(x) for x in re.findall(r'mail\.smtpserver\.smtp(\d+)', content)]
-    
-    next_server = max(all_servers, default=0) + 1
-    next_identity = max(all_identities, default=0) + 1
-    next_account = max(all_accounts, default=0) + 1
-    next_smtp = max(all_smtps, default=0) + 1
+    # Next free numbers
+    next_server = max(servers, default=0) + 1
+    next_identity = max(identities, default=0) + 1
+    next_account = max(prefs["account.account"], default=0) + 1
+    next_smtp = max(smtps, default=0) + 1
     
     # Generate new accounts
-    new_prefs = ["\n// === Cloned accounts ===\n"]
+    new_prefs = []
+    append = new_prefs.append
     new_account_keys = []
     new_smtp_keys = []
     added_count = 0
@@ -96,7 +124,7 @@ def main():
     
     for email, password, name in NEW_ACCOUNTS:
         # Skip if account already exists
-        if re.search(rf'mail\.server\.server\d+\.userName.*{re.escape(email)}', content):
+        if email.encode() in existing_emails:
             print(f"⏭ Skipping {email} (already exists)")
             skipped_count += 1
             continue
@@ -106,35 +134,37 @@ def main():
         acct = f"account{next_account}"
         smtp_key = f"smtp{next_smtp}"
         
+        # Per-account line templates, filled with (key, value) below, and
+        # the values that replace the source account's
+        srv_tpl = b'user_pref("mail.server.' + srv.encode() + b'.%s", %s);'
+        id_tpl = b'user_pref("mail.identity.' + ident.encode() + b'.%s", %s);'
+        smtp_tpl = b'user_pref("mail.smtpserver.' + smtp_key.encode() + b'.%s", %s);'
+        email_value = f'"{email}"'.encode()
+        srv_overrides = {b"userName": email_value, b"name": email_value}
+        id_overrides = {
+            b"useremail": email_value,
+            b"fullName": f'"{name}"'.encode(),
+            b"smtpServer": f'"{smtp_key}"'.encode(),
+        }
+        smtp_overrides = {b"username": email_value}
+        
         # Clone server prefs
         for key, value in server_prefs.items():
-            if key == "userName":
-                value = f'"{email}"'
-            elif key == "name":
-                value = f'"{email}"'
-            elif "spamActionTargetAccount" in key:
+            if b"spamActionTargetAccount" in key:
                 continue  # Skip spam settings
-            new_prefs.append(f'user_pref("mail.server.{srv}.{key}", {value});')
+            append(srv_tpl % (key, srv_overrides.get(key, value)))
         
         # Clone identity prefs
         for key, value in identity_prefs.items():
-            if key == "useremail":
-                value = f'"{email}"'
-            elif key == "fullName":
-                value = f'"{name}"'
-            elif key == "smtpServer":
-                value = f'"{smtp_key}"'
-            new_prefs.append(f'user_pref("mail.identity.{ident}.{key}", {value});')
+            append(id_tpl % (key, id_overrides.get(key, value)))
         
         # Clone SMTP prefs
         for key, value in smtp_prefs.items():
-            if key == "username":
-                value = f'"{email}"'
-            new_prefs.append(f'user_pref("mail.smtpserver.{smtp_key}.{key}", {value});')
+            append(smtp_tpl % (key, smtp_overrides.get(key, value)))
         
         # Account binding
-        new_prefs.append(f'user_pref("mail.account.{acct}.identities", "{ident}");')
-        new_prefs.append(f'user_pref("mail.account.{acct}.server", "{srv}");')
+        append(f'user_pref("mail.account.{acct}.identities", "{ident}");'.encode())
+        append(f'user_pref("mail.account.{acct}.server", "{srv}");'.encode())
         
         new_account_keys.append(acct)
         new_smtp_keys.append(smtp_key)
@@ -151,32 +181,33 @@ def main():
         print("\n✓ All accounts already exist, nothing to do!")
         return
     
-    # Update account list
-    accounts_match = re.search(r'user_pref\("mail\.accountmanager\.accounts", "([^"]*)"\);', content)
-    if accounts_match:
-        old_list = accounts_match.group(1)
-        new_list = old_list + "," + ",".join(new_account_keys)
-        content = re.sub(
-            r'user_pref\("mail\.accountmanager\.accounts", "[^"]*"\);',
-            f'user_pref("mail.accountmanager.accounts", "{new_list}");',
-            content
-        )
-    
-    # Update SMTP list
-    smtp_match = re.search(r'user_pref\("mail\.smtpservers", "([^"]*)"\);', content)
-    if smtp_match:
-        old_list = smtp_match.group(1)
-        new_list = old_list + "," + ",".join(new_smtp_keys)
-        content = re.sub(
-            r'user_pref\("mail\.smtpservers", "[^"]*"\);',
-            f'user_pref("mail.smtpservers", "{new_list}");',
-            content
-        )
+    # Append the new keys to the account and SMTP lists, splicing at the
+    # spans found by parse_prefs (the later one first, so the earlier
+    # span stays valid)
+    updates = [
+        (lists[name], new_keys)
+        for name, new_keys in (("accountmanager.accounts", new_account_keys), ("smtpservers", new_smtp_keys))
+        if name in lists
+    ]
+    for (start, end), new_keys in sorted(updates, reverse=True):
+        new_list = content[start:end] + b"," + ",".join(new_keys).encode()
+        content = content[:start] + new_list + content[end:]
     
-    # Write back
-    with open(PREFS_FILE, "w") as f:
-        f.write(content)
-        f.write("\n".join(new_prefs))
+    # Write back in one go, replacing prefs.js atomically so an
+    # interrupted run can't leave it truncated
+    output = content + b"\n// === Cloned accounts ===\n\n" + b"\n".join(new_prefs)
+    mode = os.stat(PREFS_FILE).st_mode
+    fd, tmp = tempfile.mkstemp(dir=PROFILE_PATH, prefix="prefs.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(output)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        os.replace(tmp, PREFS_FILE)
+    except BaseException:
+        os.unlink(tmp)
+        raise
     
     print(f"\n✓ Added {added_count} accounts, skipped {skipped_count} existing")
     print("  Start Thunderbird and enter passwords when prompted.")
@@ -3,7 +3,10 @@
 
 import imaplib
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterable
 
 # Load .env file
 from dotenv import load_dotenv
@@ -30,24 +33,89 @@ IMAP_PORT = int(os.getenv('IMAP_PORT', '143'))
 USE_SSL = os.getenv('IMAP_USE_SSL', 'false').lower() == 'true'
 USE_STARTTLS = os.getenv('IMAP_USE_STARTTLS', 'true').lower() == 'true'
 
+# Untagged STATUS line returned by LIST-STATUS, e.g. b'"Review" (MESSAGES 3)'
+STATUS_RE = re.compile(rb'^"?(.*?)"?\s+\(MESSAGES (\d+)\)')
 
-def clear_folder(imap: imaplib.IMAP4, folder: str) -> int:
-    """Clear all emails from a specific folder. Returns count deleted."""
+
+def get_message_counts(imap: imaplib.IMAP4) -> dict[str, int] | None:
+    """Get message counts for all folders in one LIST-STATUS round-trip.
+
+    Returns None if the server does not advertise LIST-STATUS, or if
+    anything about the (private imaplib) call or its reply goes wrong.
+    Folders missing from the result have an unknown count, not zero.
+    """
+    if 'LIST-STATUS' not in imap.capabilities:
+        return None
+    try:
+        typ, dat = imap._simple_command('LIST', '""', '*', 'RETURN', '(STATUS (MESSAGES))')
+        if typ != 'OK':
+            return None
+        _, statuses = imap._untagged_response(typ, dat, 'STATUS')
+
+        counts = {}
+        for line in statuses:
+            # Literal replies come back as (header, data) tuples; skip them
+            if not isinstance(line, bytes):
+                continue
+            match = STATUS_RE.match(line)
+            if match:
+                counts[match.group(1).decode()] = int(match.group(2))
+        return counts
+    except Exception:
+        return None
+
+
+def build_sequence_sets(ids: Iterable[int], max_len: int = 900) -> list[str]:
+    """Fold message ids into compact IMAP sequence sets like '1:40,42,50:55'.
+
+    Output is chunked so no single set exceeds max_len bytes, keeping each
+    command under typical server line-length limits.
+    """
+    runs = []
+    for i in sorted(set(ids)):
+        if runs and i == runs[-1][1] + 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+
+    chunks = []
+    current = ''
+    for lo, hi in runs:
+        part = str(lo) if lo == hi else f'{lo}:{hi}'
+        if current and len(current) + 1 + len(part) > max_len:
+            chunks.append(current)
+            current = part
+        else:
+            current = f'{current},{part}' if current else part
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def clear_folder(imap: imaplib.IMAP4, folder: str, message_count: int | None = None) -> int:
+    """Clear all emails from a specific folder. Returns count deleted.
+
+    If message_count is known (from LIST-STATUS) and zero, the folder is
+    skipped without any round-trip. Folders whose SEARCH comes back empty
+    return before STORE/EXPUNGE.
+    """
+    if message_count == 0:
+        return 0
     try:
         status, _ = imap.select(folder)
         if status != 'OK':
             return 0
         
         status, messages = imap.search(None, 'ALL')
-        count = 0
+        if not messages[0]:
+            return 0
         
-        if messages[0]:
-            for num in messages[0].split():
-                imap.store(num, '+FLAGS', '\\Deleted')
-                count += 1
-            imap.expunge()
+        nums = [int(num) for num in messages[0].split()]
+        for sequence_set in build_sequence_sets(nums):
+            imap.store(sequence_set, '+FLAGS', '\\Deleted')
+        imap.expunge()
         
-        return count
+        return len(nums)
     except Exception:
         return 0
 
@@ -70,9 +138,12 @@ def clear_mailbox(email: str, password: str) -> tuple[str, dict]:
         imap.login(email, password)
         
         folder_counts = {}
+        # Skip SELECT/SEARCH/EXPUNGE entirely for folders reported as empty
+        message_counts = get_message_counts(imap)
         
         for folder in FOLDERS_TO_CLEAR:
-            count = clear_folder(imap, folder)
+            known_count = None if message_counts is None else message_counts.get(folder)
+            count = clear_folder(imap, folder, known_count)
             if count > 0:
                 folder_counts[folder] = count
         
@@ -89,9 +160,12 @@ def main():
     
     total_cleared = 0
     
-    for email, password in ACCOUNTS:
-        status, result = clear_mailbox(email, password)
-        
+    # Each account has its own connection, so clear them concurrently to
+    # overlap the per-folder round-trips; map() keeps the output in order.
+    with ThreadPoolExecutor(max_workers=max(1, len(ACCOUNTS))) as pool:
+        results = pool.map(lambda account: clear_mailbox(*account), ACCOUNTS)
+    
+    for (email, _), (status, result) in zip(ACCOUNTS, results):
         if status == 'cleared':
             if result:
                 account_total = sum(result.values())
@@ -5,38 +5,368 @@ import threading
 import time
 import os
 import sys
-import json
+import gzip
+import hashlib
+import re
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import deque
 from datetime import datetime
-from dataclasses import dataclass, field, asdict
-from flask import Flask, render_template_string, jsonify, request
+from pathlib import Path
+from dataclasses import dataclass, field, fields, replace
+import orjson
+from flask import Flask, Response, request, send_file, send_from_directory
 from flask_socketio import SocketIO
+from engineio import packet as eio_packet
+from socketio import packet as sio_packet
 
 from mail_agent import load_config, Router, IMAPClient, SMTPClient
-from email_logger import log_email, log_action, get_stats
+from email_logger import log_email, log_action, get_stats, get_logger, start_background_logging
+
+
+class OrjsonCodec:
+    """json-module shim so Socket.IO packets are encoded with orjson."""
+    
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+    
+    @staticmethod
+    def loads(data, **kwargs):
+        return orjson.loads(data)
+
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'mail-agent-secret'
-socketio = SocketIO(app, cors_allowed_origins="*")
+# WebSocket-only: clients skip the long-polling handshake and upgrade.
+# Threading mode serves native WebSockets through simple-websocket.
+# Background work only uses socketio.start_background_task/socketio.sleep
+# so a different async_mode would need no other changes.
+# Events are MessagePack-encoded (the page loads the msgpack client build);
+# orjson still encodes the JSON parts of the Engine.IO handshake.
+socketio = SocketIO(
+    app,
+    async_mode='threading',
+    cors_allowed_origins="*",
+    serializer='msgpack',
+    json=OrjsonCodec,
+    transports=['websocket'],
+    ping_interval=25,
+    ping_timeout=60,
+    max_http_buffer_size=1_000_000,
+)
 
 # Global state
-emails_data = []
+# Tracked emails live in a deque kept to MAX_TRACKED_EMAILS (oldest dropped
+# first, except emails awaiting review or still being added) with a
+# uid -> EmailStatus index. Container updates go through upsert_emails
+# only, serialized by _emails_writer_lock; the index is never mutated in
+# place but rebuilt and rebound once per batch that changes membership,
+# so readers always see a consistent map without taking a lock.
+MAX_TRACKED_EMAILS = 1000
+emails_data = deque()
+emails_by_uid = {}
+_emails_writer_lock = threading.Lock()
 pending_reviews = {}  # uid -> email data for manual review
 is_running = False
 config = None
 
+# Terminal lines waiting to be flushed to clients as one batch
+_term_queue = deque()
+TERMINAL_FLUSH_INTERVAL = 0.02
+_flusher_started = False
+_flusher_lock = threading.Lock()
+
+# Kept across cycles so analyzer state (e.g. the Gemini context cache)
+# survives; rebuilt only when load_config returns a new Config
+_router = None
+_router_config = None
+
+# Idle SMTP sessions. pooled_smtp() lends one out per send, so the
+# destinations of one email can be forwarded in parallel, each over its own
+# warm session; smtp_keepalive_loop NOOPs idle sessions and drops dead ones.
+_smtp_pool = []
+_smtp_pool_lock = threading.Lock()
+_smtp_keepalive_started = False
+SMTP_KEEPALIVE_INTERVAL = 30
+
+# Fan-out of one email to several destinations (see forward_to_all)
+FORWARD_WORKERS = 8
+_forward_executor = ThreadPoolExecutor(max_workers=FORWARD_WORKERS, thread_name_prefix="forward")
+
+# Idle IMAP sessions by (host, address). pooled_imap() lends one out and
+# takes it back, so LOGIN is paid once rather than per cycle or approval;
+# concurrent borrowers each get their own session. imap_keepalive_loop
+# NOOPs idle sessions before the server's ~30 min idle timeout.
+_imap_pool = {}
+_imap_pool_lock = threading.Lock()
+_imap_keepalive_started = False
+IMAP_KEEPALIVE_INTERVAL = 25 * 60
+
+# The watcher waits in IMAP IDLE between cycles. It wakes every
+# IDLE_CHECK_INTERVAL to notice Stop and renews IDLE (with a processing
+# pass) before the server's 30 min cutoff.
+IDLE_CHECK_INTERVAL = 5
+IDLE_RENEW_INTERVAL = 29 * 60
+
+# Processing cycles run one at a time on a single worker. The queue holds
+# at most one pending cycle, so repeated refreshes and wake-ups while a
+# cycle is running or waiting collapse into one.
+_work_q = queue.Queue(maxsize=1)
+_worker_started = False
+_worker_lock = threading.Lock()
+
+LOG_DIR = Path(__file__).parent / "logs"
+BODY_DIR = Path(__file__).parent / "bodies"  # <folder>/<uid>.txt per tracked email
+AI_CACHE_PATH = Path(__file__).parent / "ai_cache.sqlite3"
+STATIC_DIR = Path(__file__).parent / "static"
+SOCKET_IO_JS = "socket.io-4.7.2.msgpack.min.js"  # versioned, so it can be cached forever
+
+LOG_STREAM_CHUNK = 64 * 1024  # bytes read per step when streaming a log
+
+# Emails changed since the last flush (uid -> EmailStatus) and UIDs no
+# longer tracked, sent as one email_updates event per EMAIL_FLUSH_INTERVAL.
+# Each batch carries a sequence number so clients can detect gaps.
+_dirty_emails = {}
+_removed_uids = []
+EMAIL_FLUSH_INTERVAL = 0.05
+_update_seq = 0
+_update_lock = threading.Lock()
+
+# The encoded 'emails' snapshot, reused for every client that connects or
+# resyncs until the next change: ((version, seq), engine.io packets).
+# _snapshot_version is bumped by queue_email_update.
+_snapshot_version = 0
+_snapshot_packets = None
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class AutoOutcome:
+    """Where an auto-approved email goes and how it is reported."""
+    folder: str
+    status: str
+    style: str
+    banner: str
+    ai_action: str
+    final_action: str
+
+
+# Keyed by whether the AI flagged the email for quarantine
+AUTO_OUTCOMES = {
+    True: AutoOutcome("Quarantine", "Quarantined", "error", "🚨 QUARANTINED", "spam", "quarantined"),
+    False: AutoOutcome("Processed", "Forwarded", "success", "✓ AUTO-APPROVED", "forward", "forwarded"),
+}
+
+
+@dataclass(slots=True)
 class EmailStatus:
     uid: str
     from_addr: str
     subject: str
-    body: str = ""
     status: str = "Pending"
     forward_to: list = field(default_factory=list)
     category: str = ""
     confidence: float = 0.0
     reasoning: str = ""
     needs_review: bool = False
+    forward_to_str: str = ""
+    folder: str = "INBOX"  # folder the UID belongs to; UIDs are per folder
+    _cached_summary: dict | None = field(default=None, repr=False, compare=False)
+    
+    def update(self, **changes) -> None:
+        """Change fields and drop the cached dict.
+        
+        All mutations go through here so to_summary() never serves stale data.
+        Setting forward_to also refreshes forward_to_str.
+        """
+        for name, value in changes.items():
+            setattr(self, name, value)
+        if 'forward_to' in changes:
+            self.forward_to_str = ", ".join(self.forward_to)
+        self._cached_summary = None
+    
+    def to_summary(self) -> dict:
+        """List-view fields for the client, built once per change.
+        
+        There is no body here: it lives on disk (see store_body) and the
+        client fetches it with get_body when the email is opened.
+        """
+        if self._cached_summary is None:
+            self._cached_summary = self._build_summary()
+        return self._cached_summary
+    
+    def _build_summary(self) -> dict:
+        return {
+            'uid': self.uid,
+            'from_addr': self.from_addr,
+            'subject': self.subject,
+            'status': self.status,
+            'forward_to_str': self.forward_to_str,
+            'category': self.category,
+            'conf': round(self.confidence * 100),  # whole percent, all the UI shows
+            'reasoning': self.reasoning,
+            'needs_review': self.needs_review,
+        }
+
+
+# Fields copied when an already tracked UID is upserted again
+_STATUS_FIELDS = tuple(f.name for f in fields(EmailStatus) if f.name != 'uid' and not f.name.startswith('_'))
+
+
+def emails_snapshot() -> list[dict]:
+    """Serializable view of all tracked emails."""
+    return [e.to_summary() for e in list(emails_data)]
+
+
+def emit_snapshot(to) -> None:
+    """Send the full email list (with current sequence number) to one client.
+    
+    The packet is encoded once per change rather than once per client, so
+    a burst of reconnects costs a single encode. That path uses
+    python-socketio internals; if they are missing, it falls back to a
+    plain emit.
+    """
+    global _snapshot_packets
+    server = socketio.server
+    eio_sid_from_sid = getattr(server.manager, 'eio_sid_from_sid', None)
+    send_packet = getattr(server.eio, 'send_packet', None)
+    if eio_sid_from_sid is None or send_packet is None or not hasattr(server, 'packet_class'):
+        with _update_lock:
+            payload = {'seq': _update_seq, 'emails': emails_snapshot()}
+        socketio.emit('emails', payload, to=to)
+        return
+    eio_sid = eio_sid_from_sid(to, '/')
+    if eio_sid is None:
+        return
+    with _update_lock:
+        key = (_snapshot_version, _update_seq)
+        if _snapshot_packets is None or _snapshot_packets[0] != key:
+            pkt = server.packet_class(
+                sio_packet.EVENT, namespace='/',
+                data=['emails', {'seq': _update_seq, 'emails': emails_snapshot()}])
+            encoded = pkt.encode()
+            if not isinstance(encoded, list):
+                encoded = [encoded]
+            _snapshot_packets = (key, [eio_packet.Packet(eio_packet.MESSAGE, e) for e in encoded])
+        packets = _snapshot_packets[1]
+    for p in packets:
+        send_packet(eio_sid, p)
+
+
+def queue_email_update(status: EmailStatus) -> None:
+    """Mark an email as changed; the flush loop sends it on its next tick."""
+    global _snapshot_version
+    with _update_lock:
+        _dirty_emails[status.uid] = status
+        _snapshot_version += 1
+
+
+def queue_email_removals(statuses: list[EmailStatus]) -> None:
+    """Mark emails as no longer tracked; sent with the next flush."""
+    global _snapshot_version
+    with _update_lock:
+        for status in statuses:
+            _dirty_emails.pop(status.uid, None)
+            _removed_uids.append(status.uid)
+        _snapshot_version += 1
+
+
+def flush_email_updates() -> None:
+    """Send all emails changed or removed since the last flush as one event."""
+    global _update_seq
+    with _update_lock:
+        if not _dirty_emails and not _removed_uids:
+            return
+        _update_seq += 1
+        changed = [e.to_summary() for e in _dirty_emails.values()]
+        removed = list(_removed_uids)
+        _dirty_emails.clear()
+        _removed_uids.clear()
+        socketio.emit('email_updates', {'seq': _update_seq, 'emails': changed, 'removed': removed})
+
+
+def upsert_emails(statuses: list[EmailStatus]) -> list[EmailStatus]:
+    """Track a batch of emails, keyed by UID; returns the tracked objects.
+    
+    A UID that is already tracked has its fields updated in place, so the
+    index is copied and republished only when the batch adds or evicts
+    emails. Past MAX_TRACKED_EMAILS the oldest emails are dropped (and
+    queued as removals for clients), but never one awaiting review or in
+    this batch: those are rotated to the back instead. If every tracked
+    email is protected, the list grows past the limit for now.
+    """
+    global emails_by_uid
+    protected = {s.uid for s in statuses}
+    tracked, added, evicted = [], {}, []
+    with _emails_writer_lock:
+        index = emails_by_uid
+        can_evict = True
+        for status in statuses:
+            existing = index.get(status.uid) or added.get(status.uid)
+            if existing is not None:
+                existing.update(**{name: getattr(status, name) for name in _STATUS_FIELDS})
+                tracked.append(existing)
+                continue
+            rotated = 0
+            while can_evict and len(emails_data) >= MAX_TRACKED_EMAILS:
+                if rotated == len(emails_data):
+                    can_evict = False  # all protected; don't rescan for this batch
+                    break
+                oldest = emails_data[0]
+                if oldest.uid in pending_reviews or oldest.uid in protected:
+                    emails_data.rotate(-1)
+                    rotated += 1
+                else:
+                    evicted.append(emails_data.popleft())
+            emails_data.append(status)
+            added[status.uid] = status
+            tracked.append(status)
+        if added or evicted:
+            index = dict(index)
+            for e in evicted:
+                del index[e.uid]
+            index.update(added)
+            emails_by_uid = index
+    if evicted:
+        queue_email_removals(evicted)
+        for e in evicted:
+            drop_body(e.uid, e.folder)
+    return tracked
+
+
+def get_email(uid) -> EmailStatus | None:
+    """Look up a tracked email by UID."""
+    return emails_by_uid.get(uid)
+
+
+def _body_path(uid, folder: str) -> Path:
+    return BODY_DIR / folder / f"{uid}.txt"
+
+
+def store_body(uid, body: str, folder: str = "INBOX") -> None:
+    """Write an email body to the on-disk cache.
+    
+    Files are keyed by folder and UID, since UIDs are only unique per
+    folder. An existing file is overwritten: it may be left over from an
+    earlier run whose UIDs were reused.
+    """
+    path = _body_path(uid, folder)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(body, encoding='utf-8')
+
+
+def load_body(uid, folder: str = "INBOX") -> str:
+    """Read an email body from the on-disk cache ("" if missing)."""
+    try:
+        return _body_path(uid, folder).read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return ""
+
+
+def drop_body(uid, folder: str = "INBOX") -> None:
+    """Delete an email body from the on-disk cache, if present."""
+    _body_path(uid, folder).unlink(missing_ok=True)
 
 
 HTML_TEMPLATE = '''
@@ -46,7 +376,9 @@ HTML_TEMPLATE = '''
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>AI Mail Redirection Agent</title>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.7.2/socket.io.min.js"></script>
+    <!-- Local copy (fetched by setup.sh) avoids a cross-origin handshake; CDN is the fallback -->
+    <script src="/static/socket.io-4.7.2.msgpack.min.js"></script>
+    <script>window.io || document.write('<script src="https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.7.2/socket.io.msgpack.min.js"><\\/script>')</script>
     <style>
         * { box-sizing: border-box; margin: 0; padding: 0; }
         body {
@@ -158,6 +490,10 @@ HTML_TEMPLATE = '''
         }
         tr:hover { background: rgba(255,255,255,0.02); }
         tr.needs-review { background: rgba(255,193,7,0.1); }
+        tr.spacer td { padding: 0; border: 0; }
+        #emailTable tr:not(.spacer) { height: 40px; }
+        #emailTable td { padding-top: 0; padding-bottom: 0; white-space: nowrap; overflow: hidden; }
+        #emailTable .btn-sm { padding: 2px 8px; line-height: 1.4; }
         .status-badge {
             padding: 4px 10px;
             border-radius: 20px;
@@ -346,7 +682,7 @@ HTML_TEMPLATE = '''
                         <button class="filter-btn" onclick="setFilter('skipped')">★ Skipped</button>
                     </div>
                 
-                <div class="table-container">
+                <div class="table-container" id="emailScroll">
                     <table>
                         <thead>
                             <tr>
@@ -363,6 +699,7 @@ HTML_TEMPLATE = '''
                             <tr><td colspan="7" style="text-align:center;color:#888;">No emails loaded</td></tr>
                         </tbody>
                     </table>
+                    <template id="rowTpl"><tr><td></td><td></td><td><span></span></td><td class="tooltip"></td><td><div class="confidence-bar"><div></div></div> </td><td></td><td class="action-btns"></td></tr></template>
                 </div>
                 
                 <div class="stats">
@@ -423,7 +760,7 @@ HTML_TEMPLATE = '''
     </div>
     
     <script>
-        const socket = io();
+        const socket = io({transports: ['websocket'], upgrade: false, reconnectionDelay: 500});
         const terminal = document.getElementById('terminal');
         
         function termPrint(text, className = '') {
@@ -480,13 +817,64 @@ HTML_TEMPLATE = '''
             }
         });
         
-        socket.on('emails', data => {
-            window.emailsData = data;
-            renderEmailTable(data);
+        // Full snapshot: sent on connect and when we ask to resync
+        let lastSeq = null;
+        socket.on('emails', snapshot => {
+            lastSeq = snapshot.seq;
+            window.emailsData = snapshot.emails;
+            window.emailsByUid = Object.fromEntries(snapshot.emails.map(e => [e.uid, e]));
+            renderEmailTable(window.emailsData);
         });
         
-        socket.on('terminal', data => {
-            termPrint(data.text, data.type || '');
+        // Bodies are not part of the list payload; fetched when an email is opened
+        window.bodyCache = {};
+        socket.on('body', data => {
+            window.bodyCache[data.uid] = data.body;
+            if (currentEmailUid == data.uid) {
+                document.getElementById('modalBody').textContent = data.body || '(No body)';
+            }
+        });
+        
+        // Batch of changed emails since the previous tick
+        socket.on('email_updates', msg => {
+            if (lastSeq === null || msg.seq <= lastSeq) return;
+            if (msg.seq !== lastSeq + 1) {
+                // Missed an update; ask for a fresh snapshot
+                lastSeq = null;
+                socket.emit('get_emails');
+                return;
+            }
+            lastSeq = msg.seq;
+            if (msg.removed && msg.removed.length) {
+                // Evicted on the server: drop them and re-render once
+                const gone = new Set(msg.removed.map(String));
+                msg.removed.forEach(uid => { delete window.emailsByUid[uid]; delete window.bodyCache[uid]; });
+                window.emailsData = window.emailsData.filter(e => !gone.has(String(e.uid)));
+                renderEmailTable(window.emailsData);
+            }
+            msg.emails.forEach(e => {
+                const existing = window.emailsByUid[e.uid];
+                if (existing) {
+                    Object.assign(existing, e);
+                } else {
+                    window.emailsData.push(e);
+                    window.emailsByUid[e.uid] = e;
+                }
+                updateRow(window.emailsByUid[e.uid]);
+            });
+        });
+        
+        socket.on('terminal_batch', items => {
+            // One DOM insert and one scroll per batch instead of per line
+            const fragment = document.createDocumentFragment();
+            items.forEach(data => {
+                const line = document.createElement('div');
+                line.className = 'terminal-line ' + (data.type || '');
+                line.textContent = data.text;
+                fragment.appendChild(line);
+            });
+            terminal.appendChild(fragment);
+            terminal.scrollTop = terminal.scrollHeight;
         });
         
         socket.on('shutdown', () => {
@@ -538,6 +926,7 @@ HTML_TEMPLATE = '''
             });
             event.target.classList.add('active');
             // Re-render table
+            document.getElementById('emailScroll').scrollTop = 0;
             if (window.emailsData) {
                 renderEmailTable(window.emailsData);
             }
@@ -552,11 +941,18 @@ HTML_TEMPLATE = '''
             
             if (tab === 'logs') {
                 loadLogSessions();
+            } else if (filteredEmails.length) {
+                // The window was sized while hidden (zero height)
+                renderWindow(true);
             }
         }
         
-        // Log viewer functions
+        // Log viewer functions. /api/logs streams the session file as
+        // NDJSON; logOffset is the byte offset after the last complete line
+        // read, so reloading the same session only fetches appended lines.
         let logData = [];
+        let logSession = null;
+        let logOffset = 0;
         
         async function loadLogSessions() {
             try {
@@ -574,9 +970,34 @@ HTML_TEMPLATE = '''
             const session = document.getElementById('logSessionSelect').value;
             if (!session) return;
             try {
-                const resp = await fetch('/api/logs?session=' + session);
-                logData = await resp.json();
-                renderLogTable();
+                if (session !== logSession) {
+                    logSession = session;
+                    logOffset = 0;
+                    logData = [];
+                }
+                const resp = await fetch(`/api/logs?session=${encodeURIComponent(session)}&after=${logOffset}`);
+                if (!resp.ok) throw new Error('HTTP ' + resp.status);
+                const reader = resp.body.getReader();
+                const decoder = new TextDecoder();
+                let pending = new Uint8Array(0);
+                for (;;) {
+                    const {done, value} = await reader.read();
+                    if (done || session !== logSession) break;
+                    const chunk = new Uint8Array(pending.length + value.length);
+                    chunk.set(pending);
+                    chunk.set(value, pending.length);
+                    let start = 0, nl;
+                    while ((nl = chunk.indexOf(10, start)) !== -1) {
+                        const line = decoder.decode(chunk.subarray(start, nl));
+                        if (line.trim()) {
+                            try { logData.push(JSON.parse(line)); } catch (e) {}
+                        }
+                        start = nl + 1;
+                    }
+                    logOffset += start;
+                    pending = chunk.slice(start);
+                }
+                if (session === logSession) renderLogTable();
             } catch(e) { console.error(e); }
         }
         
@@ -620,20 +1041,138 @@ HTML_TEMPLATE = '''
             }
         }
         
-        function renderEmailTable(data) {
-            const table = document.getElementById('emailTable');
-            let forwarded = 0, skipped = 0, errors = 0, review = 0;
+        function matchesFilter(e) {
+            if (currentFilter === 'all') return true;
+            if (currentFilter === 'review') return e.needs_review;
+            if (currentFilter === 'forwarded') return e.status === 'Forwarded';
+            if (currentFilter === 'skipped') return e.status === 'Skipped';
+            return true;
+        }
+        
+        // Rows are cloned from #rowTpl and then only mutated in place.
+        // The table is virtualized: only rows inside the scroll viewport
+        // (plus OVERSCAN either side) are in the DOM, spacer rows stand in
+        // for the rest, and rowMap holds just the rendered rows.
+        let rowMap = new Map();
+        const rowTpl = document.getElementById('rowTpl').content.firstElementChild;
+        const OVERSCAN = 10;
+        let rowHeight = 40;  // matches the fixed row height in the CSS
+        let rowHeightMeasured = false;
+        let filteredEmails = [];
+        let filteredUids = new Set();
+        let renderedRange = [0, 0];
+        
+        function buildRow(e) {
+            const tr = rowTpl.cloneNode(true);
+            tr.dataset.uid = e.uid;
+            tr.onclick = () => openEmail(tr.dataset.uid);
+            tr.cells[6].onclick = event => event.stopPropagation();
+            return tr;
+        }
+        
+        function actionButtons(uid) {
+            const approve = document.createElement('button');
+            approve.className = 'btn-sm btn-approve';
+            approve.textContent = '✓';
+            approve.onclick = () => approveEmail(uid);
+            const reject = document.createElement('button');
+            reject.className = 'btn-sm btn-reject';
+            reject.textContent = '✗';
+            reject.onclick = () => rejectEmail(uid);
+            return [approve, reject];
+        }
+        
+        function fillRow(tr, e) {
+            const cells = tr.cells;
+            tr.className = e.needs_review ? 'needs-review' : '';
+            cells[0].textContent = e.from_addr.slice(0,18);
+            cells[1].title = e.subject;
+            cells[1].textContent = e.subject.slice(0,30);
             
-            // Apply filter
-            const filtered = data.filter(e => {
-                if (currentFilter === 'all') return true;
-                if (currentFilter === 'review') return e.needs_review;
-                if (currentFilter === 'forwarded') return e.status === 'Forwarded';
-                if (currentFilter === 'skipped') return e.status === 'Skipped';
-                return true;
-            });
+            const badge = cells[2].firstChild;
+            badge.className = 'status-badge ' + (e.needs_review ? 'status-review' : 'status-' + e.status.toLowerCase());
+            badge.textContent = e.needs_review ? 'Review' : e.status;
+            
+            cells[3].textContent = e.category;
+            if (e.reasoning) cells[3].dataset.tooltip = e.reasoning;
+            else delete cells[3].dataset.tooltip;
+            
+            const fill = cells[4].firstChild.firstChild;
+            fill.className = 'confidence-fill' + (e.conf < 50 ? ' low' : '');
+            fill.style.width = e.conf + '%';
+            cells[4].lastChild.data = ` ${e.conf}%`;
+            
+            cells[5].textContent = (e.forward_to_str || '-').slice(0,22);
+            
+            if (e.needs_review) {
+                if (!cells[6].firstElementChild) cells[6].replaceChildren(...actionButtons(e.uid));
+            } else {
+                cells[6].textContent = e.status === 'Forwarded' ? '✓' : e.status === 'Skipped' ? '–' : '';
+            }
+        }
+        
+        function makeSpacer() {
+            const tr = document.createElement('tr');
+            tr.className = 'spacer';
+            const td = document.createElement('td');
+            td.colSpan = 7;
+            tr.appendChild(td);
+            return tr;
+        }
+        const topSpacer = makeSpacer();
+        const bottomSpacer = makeSpacer();
+        
+        function renderWindow(force) {
+            const scroller = document.getElementById('emailScroll');
+            const total = filteredEmails.length;
+            const last = Math.min(total, Math.ceil((scroller.scrollTop + scroller.clientHeight) / rowHeight) + OVERSCAN);
+            const first = Math.min(last, Math.max(0, Math.floor(scroller.scrollTop / rowHeight) - OVERSCAN));
+            if (!force && first === renderedRange[0] && last === renderedRange[1]) return;
+            renderedRange = [first, last];
+            
+            const rows = new Map();
+            const fragment = document.createDocumentFragment();
+            topSpacer.firstChild.style.height = (first * rowHeight) + 'px';
+            fragment.appendChild(topSpacer);
+            for (let i = first; i < last; i++) {
+                const e = filteredEmails[i];
+                const uid = String(e.uid);
+                let tr = rowMap.get(uid);
+                if (!tr) {
+                    tr = buildRow(e);
+                    fillRow(tr, e);
+                }
+                rows.set(uid, tr);
+                fragment.appendChild(tr);
+            }
+            bottomSpacer.firstChild.style.height = ((total - last) * rowHeight) + 'px';
+            fragment.appendChild(bottomSpacer);
+            document.getElementById('emailTable').replaceChildren(fragment);
+            rowMap = rows;
             
-            // Count totals from all data
+            // Rows have a fixed CSS height, so measuring the first rendered
+            // row once corrects for zoom/fonts without a re-layout loop.
+            if (rowHeightMeasured || !rows.size) return;
+            rowHeightMeasured = true;
+            const measured = rows.values().next().value.offsetHeight;
+            if (measured && measured !== rowHeight) {
+                rowHeight = measured;
+                renderWindow(true);
+            }
+        }
+        
+        let scrollQueued = false;
+        document.getElementById('emailScroll').addEventListener('scroll', () => {
+            if (scrollQueued) return;
+            scrollQueued = true;
+            requestAnimationFrame(() => {
+                scrollQueued = false;
+                renderWindow(false);
+            });
+        }, {passive: true});
+        
+        function updateStats(data) {
+            let forwarded = 0, skipped = 0, errors = 0, review = 0;
             data.forEach(e => {
                 if (e.status === 'Forwarded') forwarded++;
                 if (e.status === 'Skipped') skipped++;
@@ -641,42 +1180,6 @@ HTML_TEMPLATE = '''
                 if (e.needs_review) review++;
             });
             
-            if (filtered.length === 0) {
-                table.innerHTML = '<tr><td colspan="7" style="text-align:center;color:#888;">No emails match filter</td></tr>';
-            } else {
-                table.innerHTML = filtered.map(e => {
-                    const statusClass = e.needs_review ? 'status-review' : 'status-' + e.status.toLowerCase();
-                    const confWidth = (e.confidence * 100) + '%';
-                    const confClass = e.confidence < 0.5 ? 'low' : '';
-                    const forwardTo = e.forward_to.join(', ') || '-';
-                    const rowClass = e.needs_review ? 'needs-review' : '';
-                    
-                    let actionBtns = '';
-                    if (e.needs_review) {
-                        actionBtns = `
-                            <button class="btn-sm btn-approve" onclick="approveEmail('${e.uid}')">✓</button>
-                            <button class="btn-sm btn-reject" onclick="rejectEmail('${e.uid}')">✗</button>
-                        `;
-                    } else if (e.status === 'Forwarded') {
-                        actionBtns = '✓';
-                    } else if (e.status === 'Skipped') {
-                        actionBtns = '–';
-                    }
-                    
-                    const reasoningTooltip = e.reasoning ? `data-tooltip="${e.reasoning}"` : '';
-                    
-                    return `<tr class="${rowClass}" onclick="openEmail('${e.uid}')">
-                        <td>${e.from_addr.slice(0,18)}</td>
-                        <td title="${e.subject}">${e.subject.slice(0,30)}</td>
-                        <td><span class="status-badge ${statusClass}">${e.needs_review ? 'Review' : e.status}</span></td>
-                        <td class="tooltip" ${reasoningTooltip}>${e.category}</td>
-                        <td><div class="confidence-bar"><div class="confidence-fill ${confClass}" style="width:${confWidth}"></div></div> ${Math.round(e.confidence*100)}%</td>
-                        <td>${forwardTo.slice(0,22)}</td>
-                        <td class="action-btns" onclick="event.stopPropagation()">${actionBtns}</td>
-                    </tr>`;
-                }).join('');
-            }
-            
             document.getElementById('statTotal').textContent = data.length;
             document.getElementById('statForwarded').textContent = forwarded;
             document.getElementById('statSkipped').textContent = skipped;
@@ -684,18 +1187,48 @@ HTML_TEMPLATE = '''
             document.getElementById('statErrors').textContent = errors;
         }
         
+        function renderEmailTable(data) {
+            filteredEmails = data.filter(matchesFilter);
+            filteredUids = new Set(filteredEmails.map(e => String(e.uid)));
+            
+            if (filteredEmails.length === 0) {
+                document.getElementById('emailTable').innerHTML = '<tr><td colspan="7" style="text-align:center;color:#888;">No emails match filter</td></tr>';
+                rowMap.clear();
+                renderedRange = [0, 0];
+            } else {
+                renderWindow(true);
+            }
+            
+            updateStats(data);
+        }
+        
+        // Patch a single row in place; re-render the window when the email
+        // joins or leaves the filtered list
+        function updateRow(e) {
+            const uid = String(e.uid);
+            if (filteredUids.has(uid) !== matchesFilter(e)) {
+                renderEmailTable(window.emailsData);
+                return;
+            }
+            const row = rowMap.get(uid);
+            if (row) fillRow(row, e);
+            updateStats(window.emailsData);
+        }
+        
         // Modal functions
         function openEmail(uid) {
-            const email = window.emailsData.find(e => e.uid == uid);
+            const email = window.emailsByUid && window.emailsByUid[uid];
             if (!email) return;
             
             document.getElementById('modalFrom').textContent = email.from_addr;
             document.getElementById('modalSubject').textContent = email.subject;
-            document.getElementById('modalBody').textContent = email.body || '(No body)';
+            const body = window.bodyCache[email.uid];
+            document.getElementById('modalBody').textContent = body === undefined ? 'Loading...' : (body || '(No body)');
+            if (body === undefined) socket.emit('get_body', {uid: email.uid});
             document.getElementById('modalCategory').textContent = email.category || 'unknown';
-            document.getElementById('modalConfidence').textContent = Math.round(email.confidence * 100) + '%';
+            document.getElementById('modalConfidence').textContent = email.conf + '%';
             document.getElementById('modalReasoning').textContent = email.reasoning || '-';
-            document.getElementById('modalForwardTo').textContent = email.forward_to.join(', ') || '-';
+            document.getElementById('modalForwardTo').textContent = email.forward_to_str || '-';
             document.getElementById('modalStatus').textContent = email.status;
             
             // Track current email for prev/next navigation
@@ -923,22 +1456,66 @@ HTML_TEMPLATE = '''
 </html>
 '''
 
+def minify_html(html):
+    """Strip comments, indentation and blank lines from the page.
+    
+    Line breaks are kept so the inline JS never depends on them being
+    removed (automatic semicolons, // comments). The one <pre> is empty.
+    """
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.S)
+    html = re.sub(r'/\*.*?\*/', '', html, flags=re.S)
+    return '\n'.join(line.strip() for line in html.splitlines() if line.strip())
+
+
+# The page has no Jinja tags, so minify, encode and compress it once
+# instead of rendering per request
+_INDEX_BYTES = minify_html(HTML_TEMPLATE).encode('utf-8')
+_INDEX_GZ = gzip.compress(_INDEX_BYTES, compresslevel=9)
+_INDEX_ETAG = hashlib.sha1(_INDEX_BYTES).hexdigest()
 
 
 def term_print(text, msg_type=''):
-    """Send terminal message to clients."""
+    """Queue terminal message for the next batch sent to clients."""
     timestamp = datetime.now().strftime('%H:%M:%S')
-    socketio.emit('terminal', {'text': f'[{timestamp}] {text}', 'type': msg_type})
+    _term_queue.append({'text': f'[{timestamp}] {text}', 'type': msg_type})
 
 
-def process_emails():
-    """Fetch and process unread emails."""
-    global emails_data, pending_reviews, config
+def flush_loop():
+    """Background loop batching terminal lines and email updates.
     
-    term_print("Checking for new emails...", "info")
-    
-    try:
-        router = Router(
+    Terminal lines go out every TERMINAL_FLUSH_INTERVAL and changed emails
+    every EMAIL_FLUSH_INTERVAL, however fast they are produced.
+    """
+    last_email_flush = time.monotonic()
+    while True:
+        socketio.sleep(TERMINAL_FLUSH_INTERVAL)
+        if _term_queue:
+            batch = []
+            while _term_queue:
+                batch.append(_term_queue.popleft())
+            socketio.emit('terminal_batch', batch)
+        
+        now = time.monotonic()
+        if now - last_email_flush >= EMAIL_FLUSH_INTERVAL:
+            last_email_flush = now
+            flush_email_updates()
+
+
+def start_flusher():
+    """Start the flush loop once, on the first client connection."""
+    global _flusher_started
+    with _flusher_lock:
+        if not _flusher_started:
+            _flusher_started = True
+            socketio.start_background_task(flush_loop)
+
+
+def get_router() -> Router:
+    """Return the shared Router, rebuilding it if the config changed."""
+    global _router, _router_config
+    if _router is None or _router_config is not config:
+        _router_config = config
+        _router = Router(
             rules=config.rules,
             ai_enabled=config.ai_routing.enabled,
             gemini_api_key=config.gemini_api_key,
@@ -947,8 +1524,28 @@ def process_emails():
             default_action=config.default_action,
             company_name=config.company.name,
             company_mailbox=config.company.mailbox,
+            ai_cache_path=str(AI_CACHE_PATH),
         )
-        
+    return _router
+
+
+@contextmanager
+def pooled_smtp():
+    """Borrow a connected SMTPClient from the pool for the block.
+    
+    A session whose block raised is closed rather than returned. Dropped
+    sessions are reopened by SMTPClient.forward_email itself.
+    """
+    global _smtp_keepalive_started
+    smtp = None
+    with _smtp_pool_lock:
+        if _smtp_pool:
+            smtp = _smtp_pool.pop()
+        if not _smtp_keepalive_started:
+            _smtp_keepalive_started = True
+            socketio.start_background_task(smtp_keepalive_loop)
+    
+    if smtp is None:
         smtp = SMTPClient(
             host=config.email.smtp_host,
             port=config.email.smtp_port,
@@ -956,7 +1553,81 @@ def process_emails():
             password=config.email.password,
             use_tls=config.email.use_tls,
         )
-        
+        smtp.connect()
+    
+    try:
+        yield smtp
+    except BaseException:
+        smtp.disconnect()
+        raise
+    with _smtp_pool_lock:
+        _smtp_pool.append(smtp)
+
+
+def smtp_keepalive_loop():
+    """NOOP idle SMTP sessions, dropping any the server has closed."""
+    while True:
+        socketio.sleep(SMTP_KEEPALIVE_INTERVAL)
+        with _smtp_pool_lock:
+            sessions = list(_smtp_pool)
+            _smtp_pool.clear()
+        for smtp in sessions:
+            if smtp.noop():
+                with _smtp_pool_lock:
+                    _smtp_pool.append(smtp)
+            else:
+                smtp.disconnect()
+
+
+def forward_one(email, dest):
+    """Forward email to one destination over a pooled SMTP session."""
+    with pooled_smtp() as smtp:
+        smtp.forward_email(email, dest)
+
+
+def forward_to_all(email, destinations):
+    """Forward email to every destination, in parallel when there are several.
+    
+    Every send is attempted; each failure is printed, and the first one is
+    raised once all sends have finished.
+    """
+    if len(destinations) == 1:
+        forward_one(email, destinations[0])
+        return
+    
+    futures = [(dest, _forward_executor.submit(forward_one, email, dest)) for dest in destinations]
+    errors = []
+    for dest, future in futures:
+        try:
+            future.result()
+        except Exception as e:
+            term_print(f"✗ Forward to {dest} failed: {e}", "error")
+            errors.append(e)
+    if errors:
+        raise errors[0]
+
+
+@contextmanager
+def pooled_imap():
+    """Borrow a connected IMAPClient from the pool for the block.
+    
+    Sessions that fail NOOP are replaced; a session whose block raised is
+    closed rather than returned, since its state is unknown.
+    """
+    global _imap_keepalive_started
+    key = (config.email.imap_host, config.email.address)
+    imap = None
+    with _imap_pool_lock:
+        idle = _imap_pool.setdefault(key, [])
+        if idle:
+            imap = idle.pop()
+        if not _imap_keepalive_started:
+            _imap_keepalive_started = True
+            socketio.start_background_task(imap_keepalive_loop)
+    
+    if imap is None or not imap.noop():
+        if imap:
+            imap.disconnect()
         imap = IMAPClient(
             host=config.email.imap_host,
             port=config.email.imap_port,
@@ -965,182 +1636,220 @@ def process_emails():
             use_ssl=config.email.use_ssl,
             use_starttls=config.email.use_starttls,
         )
+        imap.connect()
+    
+    try:
+        yield imap
+    except BaseException:
+        imap.disconnect()
+        raise
+    with _imap_pool_lock:
+        _imap_pool[key].append(imap)
+
+
+def imap_keepalive_loop():
+    """NOOP idle IMAP sessions, dropping any the server has closed."""
+    while True:
+        socketio.sleep(IMAP_KEEPALIVE_INTERVAL)
+        with _imap_pool_lock:
+            sessions = [(key, imap) for key, idle in _imap_pool.items() for imap in idle]
+            for idle in _imap_pool.values():
+                idle.clear()
+        for key, imap in sessions:
+            if imap.noop():
+                with _imap_pool_lock:
+                    _imap_pool[key].append(imap)
+            else:
+                imap.disconnect()
+
+
+def process_emails():
+    """Fetch and process unread emails."""
+    global emails_data, pending_reviews, config
+    
+    term_print("Checking for new emails...", "info")
+    
+    try:
+        router = get_router()
         
-        with imap:
+        with pooled_imap() as imap:
             # Pre-create all folders at startup
             for folder in ["Processed", "Review", "Skipped", "Quarantine"]:
                 if not imap._client.folder_exists(folder):
                     imap._client.create_folder(folder)
             
             # Load existing emails from Review folder (persisted from previous sessions)
-            existing_uids = {e.uid for e in emails_data}
             review_emails = list(imap.fetch_from_folder("Review"))
+            review_tracked = []
             for e in review_emails:
-                if e.uid not in existing_uids:
-                    emails_data.append(EmailStatus(
+                if e.uid not in emails_by_uid:
+                    review_tracked.append(EmailStatus(
                         uid=e.uid,
                         from_addr=e.from_addr,
                         subject=e.subject,
-                        body=e.body,
                         status="Review",
-                        needs_review=True
+                        needs_review=True,
+                        folder="Review"
                     ))
-                    existing_uids.add(e.uid)
                 
                 # Also add to pending_reviews so they can be approved/rejected
                 if e.uid not in pending_reviews:
+                    store_body(e.uid, e.body, "Review")
                     pending_reviews[e.uid] = {
-                        'email': e,
+                        'email': replace(e, body="", raw=b""),  # body is reloaded from disk on approve
                         'decision': None,  # No AI decision for existing Review emails
-                        'smtp': smtp,
-                        'imap': imap
+                        'folder': "Review",
                     }
             
+            for tracked in upsert_emails(review_tracked):
+                queue_email_update(tracked)
+            
             emails = list(imap.fetch_unread())
             
             if not emails and not review_emails:
                 term_print("No unread emails.", "dim")
-                socketio.emit('emails', [asdict(e) for e in emails_data])
                 return
             elif not emails:
                 term_print(f"No new emails. {len(review_emails)} in Review folder.", "dim")
-                socketio.emit('emails', [asdict(e) for e in emails_data])
                 return
             
             term_print(f"Found {len(emails)} unread email(s)", "success")
             
-            # Add new emails to list (don't replace) - use existing_uids from above
-            new_emails = [e for e in emails if e.uid not in existing_uids]
+            # Add new emails to list (don't replace)
+            new_emails = [e for e in emails if e.uid not in emails_by_uid]
             
             if not new_emails:
                 term_print("No new emails to process.", "dim")
-                socketio.emit('emails', [asdict(e) for e in emails_data])
                 return
             
-            # Add new emails to tracking list
+            # Add new emails to tracking list as one batch, so none of them
+            # evicts another; the cycle keeps its own references
             for e in new_emails:
-                emails_data.append(EmailStatus(
-                    uid=e.uid,
-                    from_addr=e.from_addr,
-                    subject=e.subject,
-                    body=e.body,
-                    status="Pending"
-                ))
+                store_body(e.uid, e.body)
+            cycle_tracked = upsert_emails([
+                EmailStatus(uid=e.uid, from_addr=e.from_addr, subject=e.subject, status="Pending")
+                for e in new_emails
+            ])
+            for tracked in cycle_tracked:
+                queue_email_update(tracked)
             
-            socketio.emit('emails', [asdict(e) for e in emails_data])
+            # Moves are collected per destination folder and sent as one
+            # MOVE per folder once the loop is done
+            moves: dict[str, list[int]] = {}
             
             # Process each NEW email - ALL go to Review for user approval
-            for idx, email in enumerate(new_emails):
-                # Find index in emails_data
-                email_idx = next(i for i, e in enumerate(emails_data) if e.uid == email.uid)
-                
-                emails_data[email_idx].status = "Processing"
-                socketio.emit('emails', [asdict(e) for e in emails_data])
-                
-                decision = router.decide(email)
-                
-                # Store AI reasoning
-                if decision.ai_result:
-                    emails_data[email_idx].category = decision.ai_result.category
-                    emails_data[email_idx].confidence = decision.ai_result.confidence
-                    emails_data[email_idx].reasoning = decision.ai_result.reasoning
-                
-                # Auto-approve if confidence > 80% and has a destination
-                if decision.ai_result and decision.ai_result.confidence > 0.80 and decision.should_forward:
-                    # Check if it's a quarantine (spam/phishing)
-                    is_quarantine = decision.ai_result.category == "quarantine"
+            try:
+                for idx, (email, tracked) in enumerate(zip(new_emails, cycle_tracked)):
+                    
+                    tracked.update(status="Processing")
+                    queue_email_update(tracked)
+                    
+                    decision = router.decide(email)
+                    
+                    # Store AI reasoning
+                    if decision.ai_result:
+                        tracked.update(
+                            category=decision.ai_result.category,
+                            confidence=decision.ai_result.confidence,
+                            reasoning=decision.ai_result.reasoning,
+                        )
                     
-                    # Auto-forward
-                    try:
-                        all_destinations = decision.all_destinations
-                        for dest in all_destinations:
-                            smtp.forward_email(email, dest)
+                    # Auto-approve if confidence > 80% and has a destination
+                    if decision.ai_result and decision.ai_result.confidence > 0.80 and decision.should_forward:
+                        # Check if it's a quarantine (spam/phishing)
+                        is_quarantine = decision.ai_result.category == "quarantine"
                         
-                        # Move to appropriate folder
-                        if is_quarantine:
-                            imap.move_email(email.uid, "Quarantine")
-                            emails_data[email_idx].status = "Quarantined"
-                            term_print(f"═" * 60, "header")
-                            term_print(f"[{idx+1}/{len(new_emails)}] 🚨 QUARANTINED ({decision.ai_result.confidence:.0%})", "error")
-                        else:
-                            imap.move_email(email.uid, "Processed")
-                            emails_data[email_idx].status = "Forwarded"
+                        # Auto-forward
+                        try:
+                            all_destinations = decision.all_destinations
+                            forward_to_all(email, all_destinations)
+                            
+                            # Move to appropriate folder
+                            outcome = AUTO_OUTCOMES[is_quarantine]
+                            moves.setdefault(outcome.folder, []).append(email.uid)
+                            tracked.update(status=outcome.status, forward_to=all_destinations)
                             term_print(f"═" * 60, "header")
-                            term_print(f"[{idx+1}/{len(new_emails)}] ✓ AUTO-APPROVED ({decision.ai_result.confidence:.0%})", "success")
+                            term_print(f"[{idx+1}/{len(new_emails)}] {outcome.banner} ({decision.ai_result.confidence:.0%})", outcome.style)
+                            
+                            dest_str = ", ".join(all_destinations)
+                            term_print(f"From: {email.from_addr}", "info")
+                            term_print(f"Subject: {email.subject}", "info")
+                            term_print(f"→ {dest_str}", outcome.style)
+                            term_print(f"💭 {decision.ai_result.reasoning}", "reasoning")
+                            
+                            # Log to file
+                            log_email(
+                                uid=email.uid,
+                                from_addr=email.from_addr,
+                                to_addr=config.email.address,
+                                subject=email.subject,
+                                body=email.body,
+                                ai_action=outcome.ai_action,
+                                ai_route_to=decision.ai_result.forward_to if decision.ai_result else None,
+                                ai_category=decision.ai_result.category if decision.ai_result else "",
+                                ai_confidence=decision.ai_result.confidence if decision.ai_result else 0,
+                                ai_reason=decision.ai_result.reasoning if decision.ai_result else "",
+                                ai_raw_response="",
+                                final_action=outcome.final_action,
+                                forward_destinations=all_destinations,
+                            )
+                            
+                        except Exception as e:
+                            tracked.update(status="Error")
+                            term_print(f"[{idx+1}/{len(new_emails)}] ✗ Error: {e}", "error")
+                    
+                    else:
+                        # Needs manual review (low confidence or uncategorized)
+                        tracked.update(
+                            status="Review",
+                            needs_review=True,
+                            forward_to=decision.all_destinations if decision.should_forward else [],
+                        )
                         
-                        emails_data[email_idx].forward_to = all_destinations
+                        # Move to Review folder (persists on restart)
+                        moves.setdefault("Review", []).append(email.uid)
                         
-                        dest_str = ", ".join(all_destinations)
+                        pending_reviews[email.uid] = {
+                            'email': replace(email, body="", raw=b""),
+                            'decision': decision,
+                            'folder': tracked.folder,
+                        }
+                        
+                        # Show FULL email content in log
+                        term_print(f"═" * 60, "header")
+                        conf_pct = decision.ai_result.confidence if decision.ai_result else 0
+                        term_print(f"[{idx+1}/{len(new_emails)}] ⚠ NEEDS REVIEW ({conf_pct:.0%})", "error")
+                        term_print(f"─" * 60, "dim")
                         term_print(f"From: {email.from_addr}", "info")
                         term_print(f"Subject: {email.subject}", "info")
-                        term_print(f"→ {dest_str}", "success" if not is_quarantine else "error")
-                        term_print(f"💭 {decision.ai_result.reasoning}", "reasoning")
+                        term_print(f"─" * 60, "dim")
+                        # maxsplit keeps everything past line 30 as one string
+                        lines = email.body.split('\n', 30)
+                        for line in lines[:30]:
+                            term_print(f"  {line}", "dim")
+                        if len(lines) > 30:
+                            more = lines[30].count('\n') + 1
+                            term_print(f"  ... ({more} more lines)", "dim")
+                        term_print(f"─" * 60, "dim")
                         
-                        # Log to file
-                        log_email(
-                            uid=email.uid,
-                            from_addr=email.from_addr,
-                            to_addr=config.email.address,
-                            subject=email.subject,
-                            body=email.body,
-                            ai_action="spam" if is_quarantine else "forward",
-                            ai_route_to=decision.ai_result.forward_to if decision.ai_result else None,
-                            ai_category=decision.ai_result.category if decision.ai_result else "",
-                            ai_confidence=decision.ai_result.confidence if decision.ai_result else 0,
-                            ai_reason=decision.ai_result.reasoning if decision.ai_result else "",
-                            ai_raw_response="",
-                            final_action="quarantined" if is_quarantine else "forwarded",
-                            forward_destinations=all_destinations,
-                        )
+                        if decision.ai_result:
+                            if decision.should_forward:
+                                dest_str = ", ".join(decision.all_destinations)
+                                term_print(f"🤖 AI Suggests: {decision.ai_result.category.upper()} → {dest_str}", "success")
+                            else:
+                                term_print(f"🤖 AI Suggests: UNCATEGORIZED (no forward)", "error")
+                            term_print(f"   💭 {decision.ai_result.reasoning}", "reasoning")
                         
-                    except Exception as e:
-                        emails_data[email_idx].status = "Error"
-                        term_print(f"[{idx+1}/{len(new_emails)}] ✗ Error: {e}", "error")
-                
-                else:
-                    # Needs manual review (low confidence or uncategorized)
-                    emails_data[email_idx].status = "Review"
-                    emails_data[email_idx].needs_review = True
-                    emails_data[email_idx].forward_to = decision.all_destinations if decision.should_forward else []
+                        term_print(f"   ⏳ Waiting for user approval...", "prompt")
                     
-                    # Move to Review folder (persists on restart)
-                    imap.move_email(email.uid, "Review")
-                    
-                    pending_reviews[email.uid] = {
-                        'email': email,
-                        'decision': decision,
-                        'smtp': smtp,
-                        'imap': imap
-                    }
-                    
-                    # Show FULL email content in log
-                    term_print(f"═" * 60, "header")
-                    conf_pct = decision.ai_result.confidence if decision.ai_result else 0
-                    term_print(f"[{idx+1}/{len(new_emails)}] ⚠ NEEDS REVIEW ({conf_pct:.0%})", "error")
-                    term_print(f"─" * 60, "dim")
-                    term_print(f"From: {email.from_addr}", "info")
-                    term_print(f"Subject: {email.subject}", "info")
-                    term_print(f"─" * 60, "dim")
-                    for line in email.body.split('\n')[:30]:
-                        term_print(f"  {line}", "dim")
-                    if len(email.body.split('\n')) > 30:
-                        term_print(f"  ... ({len(email.body.split(chr(10))) - 30} more lines)", "dim")
-                    term_print(f"─" * 60, "dim")
-                    
-                    if decision.ai_result:
-                        if decision.should_forward:
-                            dest_str = ", ".join(decision.all_destinations)
-                            term_print(f"🤖 AI Suggests: {decision.ai_result.category.upper()} → {dest_str}", "success")
-                        else:
-                            term_print(f"🤖 AI Suggests: UNCATEGORIZED (no forward)", "error")
-                        term_print(f"   💭 {decision.ai_result.reasoning}", "reasoning")
-                    
-                    term_print(f"   ⏳ Waiting for user approval...", "prompt")
-                
-                socketio.emit('emails', [asdict(e) for e in emails_data])
+                    queue_email_update(tracked)
+            finally:
+                for folder, uids in moves.items():
+                    imap.move_emails(uids, folder)
             
-            forwarded = sum(1 for e in emails_data if e.status == "Forwarded")
-            review = sum(1 for e in emails_data if e.needs_review)
+            snapshot = list(emails_data)
+            forwarded = sum(1 for e in snapshot if e.status == "Forwarded")
+            review = sum(1 for e in snapshot if e.needs_review)
             term_print(f"═" * 60, "header")
             term_print(f"Done. Auto-forwarded: {forwarded} | Needs review: {review}", "success")
                 
@@ -1148,75 +1857,203 @@ def process_emails():
         term_print(f"Error: {e}", "error")
 
 
+def request_processing() -> None:
+    """Queue a processing cycle for the worker, unless one is already pending."""
+    global _worker_started
+    with _worker_lock:
+        if not _worker_started:
+            _worker_started = True
+            socketio.start_background_task(work_loop)
+    try:
+        _work_q.put_nowait(process_emails)
+    except queue.Full:
+        pass
+
+
+def work_loop():
+    """Run queued jobs in order, one at a time."""
+    while True:
+        job = _work_q.get()
+        try:
+            job()
+        except Exception as e:
+            term_print(f"✗ Error: {e}", "error")
+
+
+def wait_for_mail() -> None:
+    """Return when new mail arrives, watching stops or IDLE is due for renewal.
+    
+    Servers without IDLE are polled every 30s instead.
+    """
+    with pooled_imap() as imap:
+        if imap.supports_idle():
+            term_print("Waiting for new mail...", "dim")
+            deadline = time.monotonic() + IDLE_RENEW_INTERVAL
+            with imap.idle() as check:
+                while is_running and time.monotonic() < deadline:
+                    if check(IDLE_CHECK_INTERVAL):
+                        return
+            return
+    
+    term_print("Waiting 30s...", "dim")
+    socketio.sleep(30)
+
+
 def watch_loop():
     """Background watching loop."""
     global is_running
     while is_running:
-        process_emails()
-        term_print("Waiting 30s...", "dim")
-        time.sleep(30)
+        request_processing()
+        try:
+            wait_for_mail()
+        except Exception as e:
+            term_print(f"IDLE failed ({e}), waiting 30s...", "dim")
+            socketio.sleep(30)
 
 
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    etag = f'{_INDEX_ETAG}-gz' if use_gzip else _INDEX_ETAG
+    headers = {
+        'ETag': f'"{etag}"',
+        'Cache-Control': 'public, max-age=3600',
+        'Vary': 'Accept-Encoding',
+    }
+    if etag in request.if_none_match:
+        return Response(status=304, headers=headers)
+    
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        return Response(_INDEX_GZ, mimetype='text/html', headers=headers)
+    return Response(_INDEX_BYTES, mimetype='text/html', headers=headers)
+
+
+def json_response(obj, status: int = 200) -> Response:
+    """JSON response encoded with orjson (replaces jsonify)."""
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
+
+@app.route(f'/static/{SOCKET_IO_JS}')
+def socket_io_js():
+    response = send_from_directory(STATIC_DIR, SOCKET_IO_JS, max_age=31536000)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def log_path_for(session_id: str) -> Path:
+    """Path of the email log file for a session."""
+    return LOG_DIR / f"email_log_{session_id}.jsonl"
 
 
 @app.route('/api/log-sessions')
 def api_log_sessions():
     """List all available log sessions."""
-    from pathlib import Path
-    log_dir = Path(__file__).parent / "logs"
     sessions = []
-    if log_dir.exists():
-        for f in sorted(log_dir.glob("email_log_*.jsonl"), reverse=True):
+    if LOG_DIR.exists():
+        for f in sorted(LOG_DIR.glob("email_log_*.jsonl"), reverse=True):
             session_id = f.stem.replace("email_log_", "")
             sessions.append({
                 "session_id": session_id,
                 "size": f.stat().st_size,
             })
-    return jsonify(sessions)
+    return json_response(sessions)
+
+
+def iter_log_lines(path: Path, start: int, end: int):
+    """Yield the complete lines of a log file between two byte offsets.
+    
+    Lines are passed through unparsed, in chunks of up to LOG_STREAM_CHUNK.
+    A trailing line still being written (no newline yet) is left out.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        tail = b''
+        while remaining > 0:
+            block = f.read(min(LOG_STREAM_CHUNK, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            block = tail + block
+            cut = block.rfind(b'\n') + 1
+            tail = block[cut:]
+            if cut:
+                yield block[:cut]
 
 
 @app.route('/api/logs')
 def api_logs():
-    """Get logs for a specific session."""
+    """Stream a session's log as NDJSON, optionally from byte offset `after`."""
     try:
-        from pathlib import Path
         session_id = request.args.get('session', '')
+        after = max(request.args.get('after', 0, type=int), 0)
         if not session_id:
-            return jsonify([])
+            return Response(b'', mimetype='application/x-ndjson')
         
-        log_dir = Path(__file__).parent / "logs"
-        log_file = log_dir / f"email_log_{session_id}.jsonl"
+        log_file = log_path_for(session_id)
         
-        logs = []
-        if log_file.exists():
-            with open(log_file) as f:
-                for line in f:
-                    if line.strip():
-                        try:
-                            logs.append(json.loads(line))
-                        except:
-                            pass
-        return jsonify(logs)
+        if not log_file.exists():
+            return Response(b'', mimetype='application/x-ndjson')
+        
+        # The file's mtime identifies its content; the browser revalidates
+        # with If-None-Match and unchanged logs are never re-read
+        stat = log_file.stat()
+        headers = {'ETag': f'W/"{stat.st_mtime_ns}"', 'Cache-Control': 'no-cache'}
+        if request.if_none_match.contains_weak(str(stat.st_mtime_ns)):
+            return Response(status=304, headers=headers)
+        
+        return Response(iter_log_lines(log_file, after, stat.st_size),
+                        mimetype='application/x-ndjson', headers=headers)
     except Exception as e:
         print(f"Error in /api/logs: {e}")
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}, status=500)
 
 
 @app.route('/api/logs/download')
 def api_download_logs():
     """Download a log file."""
-    from pathlib import Path
-    from flask import send_file
     session_id = request.args.get('session', '')
-    log_dir = Path(__file__).parent / "logs"
-    log_file = log_dir / f"email_log_{session_id}.jsonl"
+    log_file = log_path_for(session_id)
     
     if log_file.exists():
-        return send_file(log_file, as_attachment=True, download_name=f"email_log_{session_id}.jsonl")
-    return jsonify({"error": "Log file not found"}), 404
+        # conditional=True lets Werkzeug answer Range/If-None-Match itself and
+        # hand the file to the server's file wrapper (sendfile) when available
+        return send_file(
+            log_file,
+            mimetype='application/x-ndjson',
+            as_attachment=True,
+            download_name=f"email_log_{session_id}.jsonl",
+            conditional=True,
+            etag=True,
+            max_age=0,
+        )
+    return json_response({"error": "Log file not found"}, status=404)
+
+
+@socketio.on('connect')
+def on_connect():
+    start_flusher()
+    emit_snapshot(to=request.sid)
+
+
+@socketio.on('get_body')
+def send_body(data):
+    """Send one email's body to the client that opened it."""
+    try:
+        uid = int(data.get('uid'))
+    except (ValueError, TypeError):
+        return
+    tracked = get_email(uid)
+    if tracked:
+        socketio.emit('body', {'uid': uid, 'body': load_body(uid, tracked.folder)}, to=request.sid)
+
+
+@socketio.on('get_emails')
+def resend_emails():
+    """Resend the full list to a client that missed an update."""
+    emit_snapshot(to=request.sid)
 
 
 @socketio.on('get_config')
@@ -1241,8 +2078,7 @@ def start_watching():
         is_running = True
         socketio.emit('status', {'running': True})
         term_print("Started watching inbox...", "success")
-        thread = threading.Thread(target=watch_loop, daemon=True)
-        thread.start()
+        socketio.start_background_task(watch_loop)
 
 
 @socketio.on('stop')
@@ -1255,8 +2091,7 @@ def stop_watching():
 
 @socketio.on('refresh')
 def refresh_once():
-    thread = threading.Thread(target=process_emails, daemon=True)
-    thread.start()
+    request_processing()
 
 
 @socketio.on('approve')
@@ -1279,65 +2114,43 @@ def approve_email(data):
         return
     
     review = pending_reviews[uid]
-    email = review['email']
+    email = replace(review['email'], body=load_body(uid, review['folder']))
     decision = review['decision']
     
     try:
-        smtp = SMTPClient(
-            host=config.email.smtp_host,
-            port=config.email.smtp_port,
-            address=config.email.address,
-            password=config.email.password,
-            use_tls=config.email.use_tls,
-        )
-        
-        imap = IMAPClient(
-            host=config.email.imap_host,
-            port=config.email.imap_port,
-            address=config.email.address,
-            password=config.email.password,
-            use_ssl=config.email.use_ssl,
-            use_starttls=config.email.use_starttls,
-        )
-        
         # Forward to all destinations
         # Handle None decision (emails from previous sessions with no AI analysis)
         destinations = []
         if decision and hasattr(decision, 'should_forward') and decision.should_forward:
             destinations = decision.all_destinations
         
-        if not destinations:
+        tracked = get_email(uid)
+        if not destinations and tracked:
             # If no AI destination, use the one shown in UI
-            for e in emails_data:
-                if e.uid == uid and e.forward_to:
-                    destinations = e.forward_to
-                    break
+            destinations = tracked.forward_to
         
         if destinations:
-            for dest in destinations:
-                smtp.forward_email(email, dest)
+            forward_to_all(email, destinations)
             dest_str = ", ".join(destinations)
             term_print(f"✓ Approved & forwarded: {email.subject[:30]} → {dest_str}", "success")
             
             # Move from Review folder to Processed folder
-            with imap:
+            with pooled_imap() as imap:
                 imap.move_email(uid, "Processed", source_folder="Review")
         else:
             term_print(f"✓ Approved (no destination): {email.subject[:30]}", "success")
         
         # Update status
-        for e in emails_data:
-            if e.uid == uid:
-                e.status = "Forwarded"
-                e.needs_review = False
-                e.forward_to = destinations
-                break
+        if tracked:
+            tracked.update(status="Forwarded", needs_review=False, forward_to=destinations)
         
         # Log the action
         log_action(uid, "approved", destinations)
         
         del pending_reviews[uid]
-        socketio.emit('emails', [asdict(e) for e in emails_data])
+        drop_body(uid, review['folder'])
+        if tracked:
+            queue_email_update(tracked)
         
     except Exception as e:
         term_print(f"✗ Error approving: {e}", "error")
@@ -1362,36 +2175,29 @@ def reject_email(data):
         term_print(f"✗ Email not found in pending reviews (uid={uid})", "error")
         return
     
-    email = pending_reviews[uid]['email']
+    review = pending_reviews[uid]
+    email = review['email']
     
     # Move from Review folder to Skipped folder
     try:
-        imap = IMAPClient(
-            host=config.email.imap_host,
-            port=config.email.imap_port,
-            address=config.email.address,
-            password=config.email.password,
-            use_ssl=config.email.use_ssl,
-            use_starttls=config.email.use_starttls,
-        )
-        with imap:
+        with pooled_imap() as imap:
             imap.move_email(uid, "Skipped", source_folder="Review")
     except Exception as e:
         term_print(f"Warning: Could not move to Skipped folder: {e}", "dim")
     
     # Update status
-    for e in emails_data:
-        if e.uid == uid:
-            e.status = "Skipped"
-            e.needs_review = False
-            break
+    tracked = get_email(uid)
+    if tracked:
+        tracked.update(status="Skipped", needs_review=False)
     
     # Log the action
     log_action(uid, "rejected")
     
     del pending_reviews[uid]
+    drop_body(uid, review['folder'])
     term_print(f"✗ Rejected: {email.subject[:30]} → Skipped folder", "dim")
-    socketio.emit('emails', [asdict(e) for e in emails_data])
+    if tracked:
+        queue_email_update(tracked)
 
 
 @socketio.on('shutdown')
@@ -1399,6 +2205,7 @@ def shutdown_server():
     term_print("Shutting down server...", "error")
     socketio.emit('shutdown')
     socketio.sleep(1)
+    get_logger().close()  # os._exit skips atexit handlers
     os._exit(0)
 
 
@@ -1408,4 +2215,5 @@ if __name__ == '__main__':
     print("="*50)
     print("\n  Open in browser: http://localhost:5000\n")
     print("="*50 + "\n")
+    start_background_logging()
     socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True)